@@ -0,0 +1,68 @@
+"""
+Ekran yakalama backend benchmark'ı
+==================================
+Bu makinede çalışan her capture backend'i (mss, imagegrab, pyautogui)
+tam ekran ve bölge yakalamada ölçer. Anlamlı sonuç için gerçek bir ekran
+gerekir; çalışmayan backend'ler "unavailable" olarak listelenir, pyautogui
+yoksa yerine sahtesi kurulur.
+
+Kullanım: python benchmarks/bench_capture.py [--iterations 30] [--region 800x600]
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+import fakes
+
+
+def measure(func, iterations):
+    func()  # warmup (bağlantı / ilk yükleme)
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return (
+        statistics.mean(samples) * 1000,
+        statistics.median(samples) * 1000,
+        samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Capture backend benchmark")
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--region", default="800x600", help="Bölge boyutu WxH (sol üst 100,100)")
+    args = parser.parse_args()
+    w, h = (int(v) for v in args.region.lower().split("x"))
+
+    fake = fakes.ensure_pyautogui()
+    from plugins import shared
+    print(f"Auto-selected backend: {shared.get_capture_backend().name}")
+    if fake:
+        print("  (pyautogui unavailable - the pyautogui row measures the fake backend)")
+    print(f"  {'backend':<10} {'capture':<16} {'size':>11} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9}")
+
+    for name in shared.CAPTURE_BACKENDS:
+        try:
+            backend = shared.create_capture_backend(name)
+            backend.probe()
+        except Exception as e:
+            print(f"  {name:<10} unavailable ({type(e).__name__}: {e})")
+            continue
+        for label, region in (("full", None), (f"region {w}x{h}", (100, 100, w, h))):
+            size = "x".join(map(str, backend.grab(region).size))
+            mean, p50, p95 = measure(lambda: backend.grab(region), args.iterations)
+            print(f"  {name:<10} {label:<16} {size:>11} {mean:>9.2f} {p50:>9.2f} {p95:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""
+Komut giriş gecikmesi benchmark'ı
+=================================
+command.json yazımından result.json'ın görünmesine kadar geçen süreyi
+ölçer: eski sabit 0.2 s polling döngüsü, adaptif polling ve inotify.
+İşleyici sadece echo yapar - ölçülen süre tamamen giriş (intake) maliyeti.
+
+Kullanım: python benchmarks/bench_intake.py [--rounds 30] [--idle 0.5]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import tempfile
+import threading
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from watcher import AdaptivePoller, InotifyWaiter, file_signature
+
+
+def write_json(path, data):
+    """Atomik yaz (tmp + rename) - istemcilerin önerilen yöntemi"""
+    tmp = path + ".tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+def legacy_loop(command_file, result_file, stop):
+    """v0.7.0 file_watcher: her 0.2 s'de exists + open + parse"""
+    last_processed_id = None
+    while not stop.is_set():
+        try:
+            if os.path.exists(command_file):
+                with open(command_file, 'r', encoding='utf-8') as f:
+                    cmd_data = json.load(f)
+                cmd_id = cmd_data.get("id", "")
+                if cmd_id and cmd_id != last_processed_id:
+                    write_json(result_file, {"status": "success", "command_id": cmd_id})
+                    last_processed_id = cmd_id
+            time.sleep(0.2)
+        except json.JSONDecodeError:
+            time.sleep(0.3)
+
+
+def waiter_loop(waiter, command_file, result_file, stop):
+    """bridge.file_watcher ile aynı mantık: imza kontrolü + waiter"""
+    waiter.add_watch(os.path.dirname(command_file), [os.path.basename(command_file)])
+    last_processed_id = None
+    last_signature = None
+    notified = True
+    while not stop.is_set():
+        try:
+            signature = file_signature(command_file)
+            if signature and (notified or signature != last_signature):
+                with open(command_file, 'r', encoding='utf-8') as f:
+                    cmd_data = json.load(f)
+                last_signature = signature
+                cmd_id = cmd_data.get("id", "")
+                if cmd_id and cmd_id != last_processed_id:
+                    write_json(result_file, {"status": "success", "command_id": cmd_id})
+                    last_processed_id = cmd_id
+                    waiter.activity()
+            notified = waiter.wait(1.0)
+        except json.JSONDecodeError:
+            notified = waiter.wait(1.0)
+
+
+def measure(loop, rounds, idle):
+    """Bir döngüyü arka planda çalıştır, komut→sonuç sürelerini topla"""
+    with tempfile.TemporaryDirectory() as tmp:
+        command_file = os.path.join(tmp, "command.json")
+        result_file = os.path.join(tmp, "result.json")
+        stop = threading.Event()
+        thread = threading.Thread(target=loop, args=(command_file, result_file, stop), daemon=True)
+        thread.start()
+        
+        samples = []
+        for i in range(rounds):
+            # İstemci düşünme süresi - polling geri çekilsin; jitter, yazımın
+            # polling aralığıyla aynı faza kilitlenip sonucu çarpıtmasını önler
+            time.sleep(idle + random.uniform(0, 0.2))
+            cmd_id = f"bench-{i}"
+            start = time.perf_counter()
+            write_json(command_file, {"id": cmd_id, "action": "status", "params": {}})
+            while True:
+                try:
+                    with open(result_file, 'r', encoding='utf-8') as f:
+                        if json.load(f).get("command_id") == cmd_id:
+                            break
+                except (OSError, ValueError):
+                    pass
+                time.sleep(0.0005)
+            samples.append((time.perf_counter() - start) * 1000)
+        
+        stop.set()
+        thread.join(timeout=2)
+        return samples
+
+
+def report(name, samples):
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    print(f"  {name:<16} mean {statistics.mean(samples):7.2f} ms   "
+          f"p50 {statistics.median(samples):7.2f} ms   p95 {p95:7.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=30)
+    parser.add_argument("--idle", type=float, default=0.5, help="Komutlar arası bekleme (s)")
+    args = parser.parse_args()
+    
+    loops = [
+        ("legacy 0.2s poll", legacy_loop),
+        ("adaptive poll", lambda c, r, s: waiter_loop(AdaptivePoller(), c, r, s)),
+    ]
+    if sys.platform.startswith("linux"):
+        loops.append(("inotify", lambda c, r, s: waiter_loop(InotifyWaiter(), c, r, s)))
+    
+    print(f"Command → result latency ({args.rounds} rounds, {args.idle}s idle between commands)")
+    for name, loop in loops:
+        report(name, measure(loop, args.rounds, args.idle))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Screenshot küçültme benchmark'ı
+===============================
+Eski yol (tam çözünürlükten LANCZOS) ile imaging.resize preset'lerini
+1080p, 1440p ve 4K sentetik karelerde MAX_WIDTH'e küçültürken karşılaştırır.
+Kalite, eski yolun çıktısına göre PSNR (dB) olarak verilir (numpy gerekir).
+
+Kullanım: python benchmarks/bench_resize.py [--iterations 20] [--resolutions 1080p,1440p,4k]
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from PIL import Image
+
+import fakes
+from plugins import imaging
+
+MAX_WIDTH = 1000  # plugins.shared.MAX_WIDTH (pyautogui import etmemek için kopya)
+
+
+def measure(func, iterations):
+    func()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return statistics.mean(samples) * 1000, statistics.median(samples) * 1000
+
+
+def psnr(image, reference):
+    if not imaging.NUMPY_AVAILABLE:
+        return None
+    np = imaging.np
+    mse = ((np.asarray(image, dtype=np.float32) - np.asarray(reference, dtype=np.float32)) ** 2).mean()
+    return float("inf") if mse == 0 else 10 * np.log10(255.0 ** 2 / mse)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resize pipeline benchmark")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--resolutions", default="1080p,1440p,4k")
+    args = parser.parse_args()
+
+    print(f"  {'source':<8} {'pipeline':<20} {'mean ms':>9} {'p50 ms':>9} {'speedup':>8} {'PSNR dB':>8}")
+    for label in args.resolutions.split(","):
+        width, height = fakes.RESOLUTIONS[label]
+        frame = fakes.synthetic_frame(width, height)
+        target = (MAX_WIDTH, int(height * MAX_WIDTH / width))
+
+        legacy = lambda: frame.resize(target, Image.LANCZOS)
+        baseline_mean, baseline_p50 = measure(legacy, args.iterations)
+        reference = legacy()
+        print(f"  {label:<8} {'legacy LANCZOS':<20} {baseline_mean:>9.2f} {baseline_p50:>9.2f} {1.0:>7.1f}x {'-':>8}")
+
+        for preset in imaging.RESIZE_PRESETS:
+            run = lambda: imaging.resize(frame, *target, preset)
+            mean, p50 = measure(run, args.iterations)
+            quality = psnr(run(), reference)
+            quality = "-" if quality is None else ("inf" if quality == float("inf") else f"{quality:.1f}")
+            print(f"  {label:<8} {preset:<20} {mean:>9.2f} {p50:>9.2f} {baseline_mean / mean:>7.1f}x {quality:>8}")
+
+
+if __name__ == '__main__':
+    main()
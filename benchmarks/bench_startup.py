@@ -0,0 +1,117 @@
+"""
+Bridge açılış süresi benchmark'ı
+================================
+Her senaryo taze bir Python sürecinde ölçülür:
+  lazy  - `import bridge` (plugin'ler ilk kullanımda yüklenir)
+  eager - `import bridge` + tüm plugin modülleri (v0.7.0 davranışı)
+Ayrıca plugin başına import maliyetini listeler ve MANIFEST'in
+modüllerin ACTIONS dict'leriyle, RESOURCES'ın MANIFEST'le tutarlı
+olduğunu doğrular.
+
+Kullanım: python benchmarks/bench_startup.py [--rounds 5]
+"""
+
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Gerçek pyautogui yoksa (headless CI) sahtesi kurulur; ölçümden önce
+# yapılır ki sahtenin PIL importu plugin maliyetine karışmasın
+FAKE_SETUP = r"""
+import sys
+if "fake" in sys.argv[1:]:
+    sys.path.insert(0, "benchmarks")
+    import fakes
+    fakes.install_fake_pyautogui()
+"""
+
+PROBE = r"""
+import json
+try:
+    import pyautogui
+    print(json.dumps(True))
+except Exception:
+    print(json.dumps(False))
+"""
+
+SCENARIO = FAKE_SETUP + r"""
+import time, json
+start = time.perf_counter()
+import bridge
+result = {"lazy": time.perf_counter() - start, "modules": {}}
+if sys.argv[1] == "eager":
+    from plugins import MANIFEST, registry
+    for name in MANIFEST:
+        t = time.perf_counter()
+        try:
+            registry.module(name)
+        except Exception as e:
+            result["modules"][name] = repr(e)
+            continue
+        result["modules"][name] = time.perf_counter() - t
+    result["eager"] = time.perf_counter() - start
+print(json.dumps(result))
+"""
+
+CHECK = FAKE_SETUP + r"""
+import json
+from plugins import MANIFEST, RESOURCES, registry
+problems = []
+unknown = sorted(set(RESOURCES) - set(registry))
+if unknown:
+    problems.append(f"RESOURCES lists unknown actions: {unknown}")
+for name, actions in MANIFEST.items():
+    try:
+        module = registry.module(name)
+    except Exception as e:
+        problems.append(f"{name}: import failed ({e!r})")
+        continue
+    if set(actions) != set(module.ACTIONS):
+        problems.append(f"{name}: manifest {sorted(actions)} != ACTIONS {sorted(module.ACTIONS)}")
+print(json.dumps(problems))
+"""
+
+
+def run(code, *args):
+    out = subprocess.run(
+        [sys.executable, "-c", code, *args], cwd=ROOT,
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    
+    fake = () if run(PROBE) else ("fake",)
+    lazy = [run(SCENARIO, "lazy", *fake)["lazy"] * 1000 for _ in range(args.rounds)]
+    eager_runs = [run(SCENARIO, "eager", *fake) for _ in range(args.rounds)]
+    eager = [r["eager"] * 1000 for r in eager_runs]
+    
+    print(f"Bridge startup ({args.rounds} fresh interpreters each, median)")
+    if fake:
+        print("  (pyautogui unavailable - fake installed, its import cost is not included)")
+    print(f"  lazy  (import bridge)                {statistics.median(lazy):8.1f} ms")
+    print(f"  eager (import bridge + all plugins)  {statistics.median(eager):8.1f} ms")
+    print("  Per-plugin import cost (first load):")
+    for name, cost in eager_runs[0]["modules"].items():
+        if isinstance(cost, str):
+            print(f"    {name:<14} failed: {cost}")
+        else:
+            print(f"    {name:<14} {cost * 1000:8.1f} ms")
+    
+    problems = run(CHECK, *fake)
+    print("  Manifest check:", "OK" if not problems else "")
+    for problem in problems:
+        print(f"    ✗ {problem}")
+
+
+if __name__ == '__main__':
+    main()
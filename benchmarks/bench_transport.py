@@ -0,0 +1,57 @@
+"""
+HTTP transport round-trip benchmark'ı
+=====================================
+Keep-alive bağlantı üzerinden POST /command → yanıt süresini ölçer.
+İşleyici sadece echo yapar - ölçülen süre tamamen taşıma maliyeti.
+Dosya protokolü ile karşılaştırma için: benchmarks/bench_intake.py
+
+Kullanım: python benchmarks/bench_transport.py [--rounds 500]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import http.client
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server import start_http_server
+
+
+def echo(cmd_data):
+    return {"status": "success", "command_id": cmd_data.get("id", "")}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=500)
+    args = parser.parse_args()
+    
+    server = start_http_server(echo, 0)
+    port = server.server_address[1]
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    headers = {"Content-Type": "application/json"}
+    
+    samples = []
+    for i in range(args.rounds):
+        body = json.dumps({"id": f"bench-{i}", "action": "status", "params": {}})
+        start = time.perf_counter()
+        conn.request("POST", "/command", body, headers)
+        result = json.loads(conn.getresponse().read())
+        samples.append((time.perf_counter() - start) * 1000)
+        assert result["command_id"] == f"bench-{i}"
+    
+    conn.close()
+    server.shutdown()
+    
+    samples.sort()
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    print(f"HTTP round trip ({args.rounds} requests, keep-alive)")
+    print(f"  mean {statistics.mean(samples):.3f} ms   p50 {statistics.median(samples):.3f} ms   p95 {p95:.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
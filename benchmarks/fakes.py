@@ -0,0 +1,265 @@
+"""
+Benchmark'lar için sahte backend'ler
+====================================
+Ekranı ve tarayıcısı olmayan bir Linux makinesinde (CI) bridge'in
+sıcak yollarını uçtan uca çalıştırmak için:
+
+  install_fake_pyautogui() - sentetik PIL kareleri döndüren pyautogui
+                           (+ PATH'te sahte xclip/xsel panosu)
+  ensure_pyautogui()       - gerçeği yüklenemiyorsa sahtesini kur
+  FakeDriver               - N elemanlı sayfa simüle eden WebDriver
+
+Sahte pyautogui gerçeği gibi her çağrıdan sonra PAUSE kadar uyur
+(_pause=False verilmedikçe), böylece giriş action'larının maliyeti
+gerçekçi kalır. install_fake_pyautogui() plugin'ler import edilmeden
+önce çağrılmalıdır.
+"""
+
+import io
+import os
+import sys
+import time
+import types
+import atexit
+import shutil
+import tempfile
+
+from PIL import Image, ImageDraw
+
+RESOLUTIONS = {
+    "1080p": (1920, 1080),
+    "1440p": (2560, 1440),
+    "4k": (3840, 2160),
+    "5k": (5120, 2880),
+}
+
+
+def synthetic_frame(width, height, seed=0):
+    """Masaüstüne benzeyen kare: gradyan arka plan, pencereler, metin benzeri satırlar"""
+    background = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+    draw = ImageDraw.Draw(background)
+    step = max(40, width // 12)
+    for i, x in enumerate(range(step // 2, width - step, step * 3)):
+        top = (i * 97 + seed * 13) % max(1, height // 2)
+        draw.rectangle([x, top, x + step * 2, top + height // 3], fill=(245, 245, 245), outline=(60, 60, 60))
+        for line in range(top + 12, top + height // 3 - 10, 14):
+            length = (line * 31 + i * 17) % (step * 2 - 20) + 10
+            draw.line([x + 8, line, x + 8 + length, line], fill=(20, 20, 20), width=2)
+    return background
+
+
+def photo_frame(width, height):
+    """Fotoğraf benzeri kare (çok renkli, gürültülü) - lossy format seçilmeli"""
+    return Image.merge("RGB", [
+        Image.effect_mandelbrot((width, height), (-2, -1, 1, 1), 100),
+        Image.linear_gradient("L").resize((width, height)),
+        Image.effect_noise((width, height), 40),
+    ])
+
+
+class FakeScreen:
+    """Sahte ekran durumu: kare, mouse pozisyonu, çağrı kaydı"""
+
+    def __init__(self, width=1920, height=1080):
+        self.calls = []
+        self.position = (0, 0)
+        self.clipboard_file = None
+        self.set_resolution(width, height)
+
+    @property
+    def clipboard(self):
+        """Sahte panoya en son kopyalanan metin"""
+        if not self.clipboard_file or not os.path.exists(self.clipboard_file):
+            return ""
+        with open(self.clipboard_file, encoding="utf-8") as f:
+            return f.read()
+
+    def set_resolution(self, width, height):
+        self.width, self.height = width, height
+        self.frame = synthetic_frame(width, height)
+        self.seed = 0
+
+    def mutate(self, box=(100, 100, 300, 200)):
+        """Küçük bir bölgeyi değiştir (tıklama sonrası UI güncellemesi gibi)"""
+        self.seed += 1
+        frame = self.frame.copy()
+        ImageDraw.Draw(frame).rectangle(box, fill=((self.seed * 40) % 256, 120, 200))
+        self.frame = frame
+
+
+screen = FakeScreen()
+
+
+def install_fake_clipboard():
+    """clipboard_copy'nin çağırdığı xclip/xsel yerine stdin'i dosyaya yazan betikler.
+    Gerçek süreç başlatma maliyeti ölçülür, kullanıcının panosu ezilmez."""
+    if sys.platform in ("darwin", "win32") or screen.clipboard_file:
+        return  # pbcopy / clip her zaman mevcut
+    bin_dir = tempfile.mkdtemp(prefix="bridge-fake-clipboard-")
+    atexit.register(shutil.rmtree, bin_dir, ignore_errors=True)
+    screen.clipboard_file = os.path.join(bin_dir, "clipboard.txt")
+    for name in ("xclip", "xsel"):
+        path = os.path.join(bin_dir, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"#!/bin/sh\ncat > '{screen.clipboard_file}'\n")
+        os.chmod(path, 0o755)
+    os.environ["PATH"] = bin_dir + os.pathsep + os.environ.get("PATH", "")
+
+
+def install_fake_pyautogui(width=1920, height=1080):
+    """sys.modules['pyautogui'] yerine sahte modülü koy"""
+    screen.set_resolution(width, height)
+    module = types.ModuleType("pyautogui")
+    module.FAILSAFE = True
+    module.PAUSE = 0.1
+    module.screen = screen
+
+    class FailSafeException(Exception):
+        pass
+
+    module.FailSafeException = FailSafeException
+
+    def _after(_pause):
+        if _pause and module.PAUSE:
+            time.sleep(module.PAUSE)
+
+    def size():
+        return (screen.width, screen.height)
+
+    def screenshot(region=None):
+        if region:
+            x, y, w, h = region
+            return screen.frame.crop((x, y, x + w, y + h))
+        return screen.frame.copy()
+
+    def position():
+        return screen.position
+
+    def _input(name, moves=False):
+        def call(*args, _pause=True, **kwargs):
+            screen.calls.append((name, args, kwargs))
+            if moves and len(args) >= 2 and args[0] is not None:
+                screen.position = (args[0], args[1])
+            elif moves and "x" in kwargs and kwargs["x"] is not None:
+                screen.position = (kwargs["x"], kwargs.get("y", 0))
+            _after(_pause)
+        return call
+
+    module.size = size
+    module.screenshot = screenshot
+    module.position = position
+    for name in ("click", "moveTo", "mouseDown", "mouseUp"):
+        setattr(module, name, _input(name, moves=True))
+    for name in ("scroll", "drag", "moveRel", "hotkey", "press", "write", "keyDown", "keyUp"):
+        setattr(module, name, _input(name))
+
+    install_fake_clipboard()
+    sys.modules["pyautogui"] = module
+    return module
+
+
+def ensure_pyautogui():
+    """Gerçek pyautogui yüklenemiyorsa (kurulu değil / ekran yok) sahtesini kur.
+    Sahte kurulduysa True döner."""
+    try:
+        import pyautogui  # noqa: F401
+        return False
+    except Exception:
+        install_fake_pyautogui()
+        return True
+
+
+# ============== SAHTE WEBDRIVER ==============
+class FakeElement:
+    def __init__(self, index, latency):
+        self._index = index
+        self._latency = latency
+        self.tag_name = "div"
+
+    def _roundtrip(self):
+        if self._latency:
+            time.sleep(self._latency)
+
+    @property
+    def text(self):
+        self._roundtrip()
+        return f"Item {self._index} - lorem ipsum dolor sit amet"
+
+    @property
+    def rect(self):
+        self._roundtrip()
+        return {"x": 10, "y": 20 + self._index * 30, "width": 300, "height": 24}
+
+    def is_displayed(self):
+        self._roundtrip()
+        return True
+
+    def is_enabled(self):
+        return True
+
+    def click(self):
+        self._roundtrip()
+
+    def clear(self):
+        self._roundtrip()
+
+    def send_keys(self, text):
+        self._roundtrip()
+
+
+class FakeDriver:
+    """N elemanlı sayfa; her çağrı isteğe bağlı sabit gecikme (round trip) ekler"""
+
+    def __init__(self, elements=50, latency=0.0, page_size=(1920, 1080)):
+        self.elements = elements
+        self.latency = latency
+        self.page_size = page_size
+        self.current_url = "https://bench.invalid/"
+        self.title = "Benchmark page"
+        self.page_source = "<html>" + "<div>item</div>" * elements + "</html>"
+
+    def _roundtrip(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def get(self, url):
+        self._roundtrip()
+        self.current_url = url
+
+    def find_elements(self, by, selector):
+        self._roundtrip()
+        return [FakeElement(i, self.latency) for i in range(self.elements)]
+
+    def find_element(self, by, selector):
+        self._roundtrip()
+        return FakeElement(0, self.latency)
+
+    def execute_script(self, script, *args):
+        self._roundtrip()
+        return None
+
+    def save_screenshot(self, path):
+        with open(path, "wb") as f:
+            f.write(self.get_screenshot_as_png())
+        return True
+
+    def get_screenshot_as_png(self):
+        self._roundtrip()
+        buffer = io.BytesIO()
+        synthetic_frame(*self.page_size).save(buffer, "PNG")
+        return buffer.getvalue()
+
+    def implicitly_wait(self, seconds):
+        pass
+
+    def quit(self):
+        pass
+
+
+def install_fake_driver(elements=50, latency=0.0):
+    """Web plugin'inin session'ına sahte driver bağla"""
+    from plugins import web
+    driver = FakeDriver(elements=elements, latency=latency)
+    web.session.driver = web.TimedDriver(driver)
+    web.session.is_open = True
+    return driver
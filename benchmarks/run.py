@@ -0,0 +1,288 @@
+"""
+Bridge benchmark suite
+======================
+process_command ve dosya izleyicisini sahte pyautogui / WebDriver
+backend'leriyle uçtan uca çalıştırır; action başına throughput ve
+gecikme raporlar. Ekran ve tarayıcı gerektirmez (headless CI).
+
+Kullanım:
+    python benchmarks/run.py                      # tüm senaryolar
+    python benchmarks/run.py --quick              # az tekrar (CI smoke)
+    python benchmarks/run.py --only screenshot,web  # sadece bu gruplar
+    python benchmarks/run.py --json out.json      # makine okunur çıktı
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+import statistics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fakes
+
+# Sahte pyautogui plugin'lerden önce yüklenmeli
+fakes.install_fake_pyautogui()
+
+import bridge
+from inbox import Inbox, ProcessedJournal
+from watcher import create_waiter
+from plugins import shared, tasks, registry, encoder
+
+
+# ============== ÖLÇÜM ==============
+def bench(name, func, iterations, warmup=1):
+    """func'ı iterations kez çalıştır; süre ve hata istatistiklerini döndür"""
+    for _ in range(warmup):
+        func()
+    samples = []
+    errors = 0
+    total_start = time.perf_counter()
+    for _ in range(iterations):
+        start = time.perf_counter()
+        result = func()
+        samples.append(time.perf_counter() - start)
+        if isinstance(result, dict) and result.get("status") in ("error", "timeout"):
+            errors += 1
+    total = time.perf_counter() - total_start
+
+    samples.sort()
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    return {
+        "name": name,
+        "n": iterations,
+        "ops_per_s": round(iterations / total, 1) if total else None,
+        "mean_ms": round(statistics.mean(samples) * 1000, 3),
+        "p50_ms": round(statistics.median(samples) * 1000, 3),
+        "p95_ms": round(p95 * 1000, 3),
+        "errors": errors
+    }
+
+
+def command(action, **params):
+    return lambda: bridge.process_command({"action": action, "params": params})
+
+
+# ============== SENARYOLAR ==============
+def changed_screenshot(params):
+    """Tıklama sonrası gibi küçük bir değişiklik, ardından screenshot (önbellek atlanmaz)"""
+    def run():
+        fakes.screen.mutate()
+        return bridge.process_command({"action": "screenshot", "params": params})
+    return run
+
+
+def screenshot_scenarios(resolutions, iterations):
+    for label in resolutions:
+        width, height = fakes.RESOLUTIONS[label]
+        fakes.screen.set_resolution(width, height)
+        for mode in ("full", "region", "window", "reference"):
+            params = {"mode": mode}
+            if mode == "region":
+                params.update(x=100, y=100, w=800, h=600)
+            yield bench(f"screenshot {mode} @{label}", changed_screenshot(params), iterations)
+        yield bench(f"screenshot diff @{label}", changed_screenshot({"mode": "diff"}), iterations)
+        for delivery in ("inline", "shm"):
+            yield bench(f"screenshot full {delivery} @{label}",
+                        changed_screenshot({"mode": "full", "delivery": delivery}), iterations)
+        yield bench(f"screenshot unchanged @{label}", command("screenshot", mode="full"), iterations)
+        yield bench(f"crop 200x120 @{label}", command("crop", x=400, y=200, w=200, h=120), iterations)
+        template = {"screenshot_id": shared.screenshot_mgr.last_full_id, "x": 300, "y": 200, "w": 60, "h": 30}
+        yield bench(f"find_image @{label}", command("find_image", template=template), iterations)
+        yield bench(f"find_image region @{label}",
+                    command("find_image", template=template, region={"x": 0, "y": 0, "w": 1280, "h": 720}),
+                    iterations)
+        yield bench(f"wait_screen_stable 100ms @{label}",
+                    command("wait_screen_stable", stable_ms=100, screenshot=False), iterations)
+        yield bench(f"screenshot pyramid @{label}", changed_screenshot({"mode": "pyramid"}), iterations)
+        yield bench(f"screenshot_tile top level @{label}",
+                    lambda: bridge.process_command({"action": "screenshot_tile", "params": {
+                        "level": len(shared.screenshot_mgr.frames.get(
+                            shared.screenshot_mgr.last_full_id).halvings) - 1, "x": 400, "y": 200}}),
+                    iterations)
+        # Arka plan ring buffer: istek yolunda yakalama/küçültme yok
+        bridge.process_command({"action": "capture_ring", "params": {"enable": True, "fps": 20}})
+        yield bench(f"screenshot ring @{label}", changed_screenshot({}), iterations)
+        bridge.process_command({"action": "capture_ring", "params": {"enable": False}})
+    fakes.screen.set_resolution(*fakes.RESOLUTIONS["1080p"])
+
+
+def expect_format(image, expected, **options):
+    """encode() çağrısı; beklenen format seçilmezse hata sonucu (errors sütununa düşer)"""
+    def run():
+        encoded = encoder.encode(image, **options)
+        if encoded.format != expected:
+            return {"status": "error", "message": f"expected {expected}, got {encoded.format}"}
+        return {"status": "success"}
+    return run
+
+
+def encode_scenarios(iterations):
+    photo = fakes.photo_frame(1000, 600)
+    ui = fakes.synthetic_frame(1000, 600)
+    yield bench("encode auto photo", expect_format(photo, "jpeg"), iterations)
+    yield bench("encode auto grayscale photo", expect_format(photo, "jpeg", grayscale=True), iterations)
+    yield bench("encode auto ui", expect_format(ui, "png"), iterations)
+    yield bench("encode auto grayscale ui", expect_format(ui, "png", grayscale=True), iterations)
+
+
+def input_scenarios(iterations):
+    yield bench("click", command("click", x=500, y=300), iterations)
+    yield bench("click screenshot_coords", command("click", x=500, y=300, screenshot_coords=True), iterations)
+    yield bench("click observe (stable 100ms)",
+                command("click", x=500, y=300, observe={"stable_ms": 100}), iterations)
+    yield bench("move (duration 0)", command("move", x=10, y=10, duration=0), iterations)
+    yield bench("key", command("key", key="enter"), iterations)
+    yield bench("key combo", command("key", key="ctrl+shift+t"), iterations)
+    yield bench("type_raw 20 chars", command("type_raw", text="x" * 20, interval=0), iterations)
+    yield bench("type (clipboard)", command("type", text="Merhaba dünya"), iterations)
+    # 5 alanlı form: tıkla + yaz + tab (20 olay), örtük PAUSE yok
+    form = []
+    for i in range(5):
+        form += [{"type": "click", "x": 400, "y": 200 + i * 40}, {"type": "text", "text": f"field {i}"},
+                 {"type": "key", "key": "tab"}, {"type": "delay", "ms": 1}]
+    yield bench("input_sequence form (20 events)", command("input_sequence", events=form), iterations)
+
+
+def web_scenarios(element_counts, latency, iterations):
+    for count in element_counts:
+        fakes.install_fake_driver(elements=count, latency=latency)
+        yield bench(f"web_elements n={count}", command("web_elements", selector=".item", limit=count), iterations)
+    fakes.install_fake_driver(elements=10, latency=latency)
+    yield bench("web_find", command("web_find", selector="#x"), iterations)
+    yield bench("web_screenshot", command("web_screenshot", filename="bench.jpg"), iterations)
+    yield bench("web_screenshot inline", command("web_screenshot", delivery="inline"), iterations)
+
+
+def task_scenarios(step_counts, iterations, workdir):
+    tasks.TASKS_DIR = os.path.join(workdir, "tasks")
+    os.makedirs(tasks.TASKS_DIR, exist_ok=True)
+    for count in step_counts:
+        steps = [{"action": "mouse", "params": {}} for _ in range(count)]
+        with open(os.path.join(tasks.TASKS_DIR, f"bench_{count}.json"), 'w', encoding='utf-8') as f:
+            json.dump({"name": f"bench {count}", "steps": steps}, f)
+        yield bench(f"run_task steps={count}", command("run_task", task=f"bench_{count}"), iterations)
+        yield bench(f"batch steps={count}", command("batch", steps=steps), iterations)
+
+
+def end_to_end_scenarios(iterations, workdir):
+    """Dosya izleyicisi üzerinden: command.json gecikmesi ve inbox throughput'u"""
+    bridge.COMMAND_FILE = os.path.join(workdir, "command.json")
+    bridge.RESULT_FILE = os.path.join(workdir, "result.json")
+    inbox = Inbox(
+        ProcessedJournal(os.path.join(workdir, "processed.jsonl")),
+        inbox_dir=os.path.join(workdir, "inbox"),
+        results_dir=os.path.join(workdir, "results"),
+    )
+    thread = threading.Thread(target=bridge.file_watcher, args=(create_waiter(), inbox), daemon=True)
+    thread.start()
+    counter = iter(range(10 ** 9))
+
+    def write_command(path, data):
+        with open(f"{path}.tmp", 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(f"{path}.tmp", path)
+
+    def wait_for(path, cmd_id=None):
+        while True:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    result = json.load(f)
+                if cmd_id is None or result.get("command_id") == cmd_id:
+                    return result
+            except (OSError, ValueError):
+                pass
+            time.sleep(0.0005)
+
+    def via_command_file():
+        cmd_id = f"e2e-{next(counter)}"
+        write_command(bridge.COMMAND_FILE, {"id": cmd_id, "action": "status", "params": {}})
+        return wait_for(bridge.RESULT_FILE, cmd_id)
+
+    def via_inbox(batch=20):
+        ids = [f"q-{next(counter)}" for _ in range(batch)]
+        for cmd_id in ids:
+            write_command(os.path.join(inbox.inbox_dir, f"{cmd_id}.json"),
+                          {"id": cmd_id, "action": "status", "params": {}})
+        for cmd_id in ids:
+            wait_for(inbox.result_path(cmd_id))
+
+    yield bench("e2e command.json status", via_command_file, iterations)
+    result = bench("e2e inbox 20x status", via_inbox, max(1, iterations // 5))
+    result["per_command_ms"] = round(result["mean_ms"] / 20, 3)
+    yield result
+    yield bench("executor status", lambda: bridge.execute({"action": "status", "params": {}}), iterations)
+
+
+# ============== RAPOR ==============
+def print_row(row):
+    print(f"  {row['name']:<32} {row['n']:>5} {row['ops_per_s'] or 0:>10.1f} "
+          f"{row['mean_ms']:>10.3f} {row['p50_ms']:>10.3f} {row['p95_ms']:>10.3f} {row['errors']:>6}"
+          f"{'  FAILED' if row['errors'] else ''}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--quick", action="store_true", help="Az tekrar (CI smoke)")
+    parser.add_argument("--iterations", type=int, default=None)
+    parser.add_argument("--only", default="", help="Virgülle ayrılmış gruplar: screenshot,encode,input,web,task,e2e")
+    parser.add_argument("--resolutions", default="1080p,1440p,4k")
+    parser.add_argument("--web-latency-ms", type=float, default=0.0, help="Sahte WebDriver round trip gecikmesi")
+    parser.add_argument("--json", default=None, help="Sonuçları JSON dosyasına yaz")
+    args = parser.parse_args()
+
+    iterations = args.iterations or (5 if args.quick else 30)
+    workdir = tempfile.mkdtemp(prefix="bridge-bench-")
+    # Sahte ekran pyautogui üzerinden okunur; gerçek ekranı yakalayan backend'ler devre dışı
+    shared.set_capture_backend("pyautogui")
+    # Screenshot çıktıları geçici dizine
+    shared.SCREENSHOT_DIR = workdir
+    shared.screenshot_mgr.reference_path = os.path.join(workdir, "reference.jpg")
+    shared.screenshot_mgr.latest_path = os.path.join(workdir, "latest.jpg")
+    registry.module("web").SCREENSHOT_DIR = workdir
+    bridge.print = lambda *args, **kwargs: None  # Komut başına konsol logunu sustur
+
+    groups = [
+        ("screenshot", lambda: screenshot_scenarios(args.resolutions.split(","), iterations)),
+        ("encode", lambda: encode_scenarios(iterations)),
+        ("input", lambda: input_scenarios(iterations)),
+        ("web", lambda: web_scenarios((10, 100, 1000), args.web_latency_ms / 1000, iterations)),
+        ("task", lambda: task_scenarios((5, 20, 100), iterations, workdir)),
+        ("e2e", lambda: end_to_end_scenarios(iterations, workdir)),
+    ]
+
+    print(f"Bridge benchmarks (fake backends, {iterations} iterations, pyautogui.PAUSE={shared.pyautogui.PAUSE})")
+    print(f"  {'scenario':<32} {'n':>5} {'ops/s':>10} {'mean ms':>10} {'p50 ms':>10} {'p95 ms':>10} {'errors':>6}")
+    only = set(filter(None, args.only.split(",")))
+    rows = []
+    try:
+        for group, scenarios in groups:
+            if only and group not in only:
+                continue
+            for row in scenarios():
+                row["group"] = group
+                rows.append(row)
+                print_row(row)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({"timestamp": time.time(), "iterations": iterations, "results": rows}, f, indent=2)
+
+    # Hata veren senaryonun süresi ölçüm değil - CI'da kırmızıya düşsün
+    failed = [row["name"] for row in rows if row["errors"]]
+    if failed:
+        print(f"\n{len(failed)} scenario(s) failed: {', '.join(failed)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
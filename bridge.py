@@ -3,38 +3,78 @@ Claude Desktop Bridge v0.7.0
 ============================
 Plugin-based architecture - Modüler ve genişletilebilir.
 
-Kullanım: python bridge.py
+Kullanım: python bridge.py [--http PORT]
 """
 
 import json
 import time
 import os
 import sys
+import argparse
 from datetime import datetime
+from concurrent.futures import Future
 
 # ============== AYARLAR ==============
 BRIDGE_DIR = os.path.dirname(os.path.abspath(__file__))
 COMMAND_FILE = os.path.join(BRIDGE_DIR, "command.json")
 RESULT_FILE = os.path.join(BRIDGE_DIR, "result.json")
+IDLE_RECHECK = 1.0  # Notifier olsa bile bu aralıkla dosyayı yeniden kontrol et
+METRICS_FILE = os.path.join(BRIDGE_DIR, "metrics.prom")
+METRICS_INTERVAL = 15.0  # Prometheus dosyasının yeniden yazılma aralığı (saniye)
+HTTP_PORT = int(os.environ.get("BRIDGE_HTTP_PORT", "0"))  # 0 = HTTP transport kapalı
+CAPTURE_RING_FPS = float(os.environ.get("BRIDGE_RING_FPS", "0"))  # >0 = arka plan yakalama açık
 
 # ============== PLUGIN LOADER ==============
-from plugins import get_all_handlers
-from plugins.shared import screenshot_mgr, MAX_WIDTH
-from plugins.tasks import run_task, list_tasks
+from plugins import get_all_handlers, MANIFEST
+from plugins.tasks import run_task, run_batch, list_tasks, load_task
+from watcher import create_waiter, file_signature
+from inbox import Inbox, ProcessedJournal, write_json_atomic
+from server import start_http_server
+from executor import CommandExecutor
+from plugins.context import CommandCancelled
+from plugins.metrics import metrics, start_prometheus_writer
+from profiling import profile_call
 
 HANDLERS = get_all_handlers()
+COMPOSITE_ACTIONS = ("run_task", "batch", "list_tasks")
 
 
 # ============== KOMUT İŞLEYİCİ ==============
 def process_command(cmd_data):
-    """Komutu ilgili plugin'e yönlendir"""
+    """Komutu ilgili plugin'e yönlendir, süre ve durumu metriklere kaydet"""
     action = cmd_data.get("action", "")
     params = cmd_data.get("params", {})
     
+    start = time.perf_counter()
+    profile = cmd_data.get("profile")
+    if profile:
+        # İsteğe bağlı profil: cProfile (+ tracemalloc), özet sonuca eklenir
+        label = f"{cmd_data.get('id', '')}-{action}"
+        result, result_profile = profile_call(run_action, (action, params), profile, label)
+        result["profile"] = result_profile
+    else:
+        result = run_action(action, params)
+    if action in HANDLERS or action in COMPOSITE_ACTIONS:
+        metrics.record_action(action, time.perf_counter() - start, result.get("status"))
+    return result
+
+
+def run_action(action, params):
+    """Action'ı çalıştır"""
     # Task sistemi (handlers referansı gerekiyor)
     if action == "run_task":
         try:
             return run_task(params, HANDLERS)
+        except CommandCancelled as e:
+            return {"status": e.reason, "message": str(e)}
+        except Exception as e:
+            return {"status": "error", "message": str(e)}
+    
+    if action == "batch":
+        try:
+            return run_batch(params, HANDLERS)
+        except CommandCancelled as e:
+            return {"status": e.reason, "message": str(e)}
         except Exception as e:
             return {"status": "error", "message": str(e)}
     
@@ -48,6 +88,8 @@ def process_command(cmd_data):
     if action in HANDLERS:
         try:
             return HANDLERS[action](params)
+        except CommandCancelled as e:
+            return {"status": e.reason, "message": str(e)}
         except Exception as e:
             return {"status": "error", "message": str(e)}
     else:
@@ -58,53 +100,181 @@ def process_command(cmd_data):
 def write_result(result):
     """Sonucu dosyaya yaz"""
     result["timestamp"] = datetime.now().isoformat()
-    with open(RESULT_FILE, 'w', encoding='utf-8') as f:
-        json.dump(result, f, indent=2, ensure_ascii=False)
+    write_json_atomic(RESULT_FILE, result)
+
+
+def handle_command(cmd_data):
+    """Komutu işle, command_id ekle ve konsola logla"""
+    cmd_id = cmd_data.get("id", "")
+    action = cmd_data.get("action", "unknown")
+    print(f"  → Processing: {action} (id: {cmd_id})")
+    
+    result = process_command(cmd_data)
+    result["command_id"] = cmd_id
+    result["timestamp"] = datetime.now().isoformat()
+    
+    # Debug bilgisi
+    if "path" in result:
+        print(f"    Screenshot: {result['path']} ({result.get('size_kb', '?')} KB)")
+    elif "delivery" in result:
+        print(f"    Screenshot: {result['delivery']} ({result.get('size_kb', '?')} KB)")
+    if "real_coords" in result:
+        print(f"    Coords: {result.get('input_coords')} → {result.get('real_coords')}")
+    return result
+
+
+def command_resources(cmd_data):
+    """Komutun kilitlemesi gereken kaynaklar (task/batch: adımların birleşimi)"""
+    action = cmd_data.get("action", "")
+    params = cmd_data.get("params") or {}
+    
+    if action == "batch":
+        steps = params.get("steps") or []
+    elif action == "run_task":
+        task_data, error = load_task(params.get("task", ""))
+        steps = task_data.get("steps", []) if task_data else []
+    else:
+        return step_resources(cmd_data)
+    
+    names = set()
+    for step in steps if isinstance(steps, list) else []:
+        if isinstance(step, dict):
+            names.update(step_resources(step))
+            if step.get("wait_after") == "stable":
+                names.update(HANDLERS.resources("wait_screen_stable"))
+    return names
+
+
+def step_resources(step):
+    """Tek action'ın kaynakları; observe seçeneği ekranı da kilitler"""
+    names = set(HANDLERS.resources(step.get("action", "")))
+    params = step.get("params")
+    if isinstance(params, dict) and params.get("observe"):
+        names.update(HANDLERS.resources("wait_screen_stable"))
+    return names
+
+
+# Kaynakları çakışmayan komutlar paralel çalışır
+executor = CommandExecutor(handle_command)
+
+
+def _completed(result, cmd_data, callback):
+    """Çalıştırıcıya girmeden sonuçlanan komut için hazır Future"""
+    result["command_id"] = cmd_data.get("id", "")
+    result["timestamp"] = datetime.now().isoformat()
+    future = Future()
+    future.set_result(result)
+    if callback:
+        callback(result)
+    return future
+
+
+def cancel_command(params):
+    """Sıradaki veya çalışan komutu iptal et"""
+    target = params.get("id", "")
+    if not target:
+        return {"status": "error", "message": "id of the command to cancel required"}
+    
+    state = executor.cancel(target)
+    if state is None:
+        return {"status": "error", "action": "cancel", "message": f"No queued or running command with id: {target}"}
+    return {"status": "success", "action": "cancel", "cancelled": target, "state": state}
+
+
+def dispatch(cmd_data, callback=None):
+    """Komutu çalıştırıcıya gönder; sonuç Future ve callback ile gelir"""
+    # cancel kuyruğa girmez - hedef komut tüm worker'ları meşgul etse bile hemen çalışır
+    if cmd_data.get("action") == "cancel":
+        return _completed(cancel_command(cmd_data.get("params", {})), cmd_data, callback)
+    
+    deadline_ms = cmd_data.get("deadline_ms")
+    # bool int'in alt sınıfı - true 1 ms'lik deadline olarak kabul edilmesin
+    if deadline_ms is not None and (isinstance(deadline_ms, bool) or not isinstance(deadline_ms, (int, float))
+                                    or deadline_ms <= 0):
+        return _completed({"status": "error", "message": "deadline_ms must be a positive number"},
+                          cmd_data, callback)
+    
+    return executor.submit(cmd_data, command_resources(cmd_data), callback)
+
 
+def execute(cmd_data):
+    """Komutu çalıştır ve sonucunu bekle (HTTP transport)"""
+    return dispatch(cmd_data).result()
 
-def file_watcher():
-    """command.json dosyasını izle"""
+
+def file_watcher(waiter=None, inbox=None):
+    """inbox/ kuyruğunu ve command.json dosyasını izle
+    (inotify varsa olay tabanlı, yoksa adaptif polling)"""
+    if waiter is None:
+        waiter = create_waiter()
+    if inbox is None:
+        inbox = Inbox(ProcessedJournal())
+    waiter.add_watch(os.path.dirname(COMMAND_FILE), [os.path.basename(COMMAND_FILE)])
+    waiter.add_watch(inbox.inbox_dir)
+    
     last_processed_id = None
+    last_signature = None
+    startup_signature = file_signature(COMMAND_FILE)
+    notified = True
     
     while True:
         try:
-            if os.path.exists(COMMAND_FILE):
+            # 1) Kuyruktaki komutlar - sırayla, hiçbiri kaybolmaz
+            if inbox.drain(dispatch):
+                waiter.activity()
+            
+            # 2) Tek slotlu command.json (geriye uyumluluk)
+            signature = file_signature(COMMAND_FILE)
+            # Dosya değişmediyse yeniden açıp parse etme
+            if signature and (notified or signature != last_signature):
                 with open(COMMAND_FILE, 'r', encoding='utf-8') as f:
                     cmd_data = json.load(f)
+                last_signature = signature
                 
                 cmd_id = cmd_data.get("id", "")
                 if cmd_id and cmd_id != last_processed_id:
-                    action = cmd_data.get("action", "unknown")
-                    print(f"  → Processing: {action} (id: {cmd_id})")
-                    
-                    result = process_command(cmd_data)
-                    result["command_id"] = cmd_id
-                    write_result(result)
-                    
-                    # Debug bilgisi
-                    if "path" in result:
-                        print(f"    Screenshot: {result['path']} ({result.get('size_kb', '?')} KB)")
-                    if "real_coords" in result:
-                        print(f"    Coords: {result.get('input_coords')} → {result.get('real_coords')}")
-                    
+                    # Açılışta zaten duran dosya restart öncesinden kalmıştır: günlüğe bak.
+                    # Sonradan yazılan dosya yeni komuttur (id'yi yeniden kullanan istemciler dahil)
+                    rerun = signature != startup_signature or last_processed_id is not None
+                    error = inbox.duplicate_error(cmd_id, rerun=rerun)
+                    if error:
+                        print(f"  ✗ {error['message']}")
+                        write_result(error)
+                    else:
+                        inbox.submit(cmd_id, cmd_data, dispatch, on_result=write_result, rerun=rerun)
                     last_processed_id = cmd_id
+                    waiter.activity()
             
-            time.sleep(0.2)
+            notified = waiter.wait(IDLE_RECHECK)
         
         except json.JSONDecodeError:
-            time.sleep(0.3)
+            # Yazım yarıda - bir sonraki olayda/turda tekrar dene
+            notified = waiter.wait(IDLE_RECHECK)
         except Exception as e:
             print(f"  ✗ Error: {e}")
             time.sleep(1)
+            notified = True
 
 
 # ============== ANA FONKSİYON ==============
+def print_reference(ref_result):
+    """Arka plan referans screenshot'ının özetini yazdır"""
+    if ref_result.get("status") == "error":
+        print(f"  ✗ Reference screenshot failed: {ref_result.get('message')}")
+        return
+    screen_w, screen_h = ref_result['screen_size']
+    print(f"    Reference: {ref_result['path']} ({ref_result['size_kb']} KB)")
+    print(f"    Screen: {screen_w}x{screen_h} → Screenshot: {ref_result['width']}x{ref_result['height']}"
+          f" (ratio: {ref_result['scale_ratio']}x)")
+
+
 def main():
-    import pyautogui
-    screen_w, screen_h = pyautogui.size()
-    ratio = round(screen_w / MAX_WIDTH, 2)
+    parser = argparse.ArgumentParser(description="Claude Desktop Bridge")
+    parser.add_argument("--http", type=int, default=HTTP_PORT, metavar="PORT",
+                        help="127.0.0.1:PORT üzerinde HTTP transport'u da aç")
+    args = parser.parse_args()
     
-    # Yüklenen action'ları listele
+    # Kullanılabilir action'ları listele (plugin'ler ilk kullanımda yüklenir)
     action_list = sorted(HANDLERS.keys())
     
     print(f"""
@@ -113,9 +283,8 @@ def main():
 ║         Plugin-Based Architecture                            ║
 ╠══════════════════════════════════════════════════════════════╣
 ║  Platform: {sys.platform:<49} ║
-║  Screen: {screen_w}x{screen_h} → Screenshot: {MAX_WIDTH}px (ratio: {ratio}x)      ║
 ╠══════════════════════════════════════════════════════════════╣
-║  Loaded Actions ({len(action_list)}):                                         ║""")
+║  Actions ({len(action_list)}):                                                ║""")
     
     # Action'ları 3'lü gruplar halinde göster
     for i in range(0, len(action_list), 3):
@@ -123,9 +292,10 @@ def main():
         line = ", ".join(group)
         print(f"║    {line:<56} ║")
     
+    plugin_names = ", ".join(MANIFEST)
     print(f"""╠══════════════════════════════════════════════════════════════╣
-║  Plugins: screenshot, mouse, keyboard, window,              ║
-║           accessibility, system                              ║
+║  Plugins (lazy): {plugin_names[:44]:<44} ║
+║    {plugin_names[44:]:<56} ║
 ╠══════════════════════════════════════════════════════════════╣
 ║  Durdurmak için: Ctrl+C                                      ║
 ╚══════════════════════════════════════════════════════════════╝
@@ -133,17 +303,26 @@ def main():
     
     write_result({"status": "ready", "message": "Bridge started", "version": "0.7.0"})
     
-    print("  → Taking reference screenshot...")
-    ref_result = screenshot_mgr.take_reference()
-    print(f"    Reference: {ref_result['path']} ({ref_result['size_kb']} KB)")
-    print(f"    Screen: {ref_result['screen_size'][0]}x{ref_result['screen_size'][1]}")
-    print(f"    Resized: {ref_result['width']}x{ref_result['height']}")
-    print()
-    print("  Waiting for commands...")
+    start_prometheus_writer(METRICS_FILE, METRICS_INTERVAL)
+    
+    # Referans screenshot arka planda - "screen" kaynağını tutar, komut alımını bekletmez
+    print("  → Taking reference screenshot in background...")
+    dispatch({"id": "", "action": "screenshot", "params": {"mode": "reference"}},
+             callback=print_reference)
+    
+    if CAPTURE_RING_FPS > 0:
+        ring = execute({"action": "capture_ring", "params": {"enable": True, "fps": CAPTURE_RING_FPS}})
+        print(f"  Capture ring: {ring.get('fps')} fps, {ring.get('size')} frames")
+    
+    if args.http:
+        start_http_server(execute, args.http)
+        print(f"  HTTP transport: POST http://127.0.0.1:{args.http}/command")
+    waiter = create_waiter()
+    print(f"  Waiting for commands... (intake: {waiter.kind})")
     print()
     
     try:
-        file_watcher()
+        file_watcher(waiter)
     except KeyboardInterrupt:
         print("\n  Bridge stopped.")
 
@@ -0,0 +1,171 @@
+"""
+Eşzamanlı komut çalıştırıcı
+===========================
+Komutlar bir thread havuzunda çalışır. Her action ihtiyaç duyduğu
+kaynakları bildirir (örn. "input" = fiziksel mouse/klavye, "browser" =
+Selenium session, "screen" = screenshot manager). Aynı kaynağı isteyen
+komutlar geliş sırasıyla tek tek çalışır; kaynakları çakışmayan komutlar
+(örn. uzun bir `run` ile screenshot) paralel ilerler.
+
+Her komut `deadline_ms` alabilir; süre dolunca yapılandırılmış bir
+timeout sonucu hemen teslim edilir ve handler iptal sinyali alır.
+Çalışan ya da sırada bekleyen bir komut id'si ile iptal edilebilir.
+"""
+
+import threading
+from datetime import datetime
+from collections import defaultdict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from plugins.context import CommandContext, set_context
+from plugins.metrics import metrics
+
+MAX_WORKERS = 8
+
+
+class _Job:
+    __slots__ = ("cmd_data", "resources", "future", "callback", "context", "state", "timer")
+
+    def __init__(self, cmd_data, resources, callback, context):
+        self.cmd_data = cmd_data
+        self.resources = frozenset(resources)
+        self.future = Future()
+        self.callback = callback
+        self.context = context
+        self.state = "queued"  # queued → running → done
+        self.timer = None
+
+
+class CommandExecutor:
+    """Kaynak kuyruklu thread havuzu: çakışan komutlar FIFO, diğerleri paralel"""
+
+    def __init__(self, run, max_workers=MAX_WORKERS):
+        self._run = run
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bridge-worker")
+        self._lock = threading.Lock()
+        self._queues = defaultdict(deque)  # kaynak -> sıradaki işler
+        self._waiting = []                 # henüz başlamamış işler (geliş sırasıyla)
+        self._active = {}                  # komut id -> iş (iptal için)
+
+    def submit(self, cmd_data, resources=(), callback=None):
+        """Komutu sıraya al. Sonuç hem Future'a hem (varsa) callback'e iletilir."""
+        cmd_id = cmd_data.get("id", "")
+        deadline_ms = cmd_data.get("deadline_ms")
+        context = CommandContext(cmd_id, deadline_ms, cmd_data.get("delivery"))
+        job = _Job(cmd_data, resources, callback, context)
+
+        with self._lock:
+            for name in job.resources:
+                self._queues[name].append(job)
+            self._waiting.append(job)
+            if cmd_id:
+                self._active[cmd_id] = job
+            self._start_ready()
+
+        if deadline_ms is not None:
+            job.timer = threading.Timer(deadline_ms / 1000, self._expire, args=(job,))
+            job.timer.daemon = True
+            job.timer.start()
+        return job.future
+
+    def run(self, cmd_data, resources=()):
+        """Komutu çalıştır ve sonucu bekle (senkron taşıma katmanları için)"""
+        return self.submit(cmd_data, resources).result()
+
+    def cancel(self, cmd_id, reason="cancelled"):
+        """Sıradaki ya da çalışan komutu iptal et. Komutun önceki durumunu döndürür."""
+        with self._lock:
+            job = self._active.get(cmd_id)
+            if job is None:
+                return None
+            state = job.state
+            self._abort(job, reason)
+
+        self._deliver(job, self._aborted_result(job, reason, state))
+        return state
+
+    def _expire(self, job):
+        """Deadline doldu"""
+        with self._lock:
+            if job.state == "done":
+                return
+            state = job.state
+            self._abort(job, "timeout")
+        metrics.record_timeout(job.cmd_data.get("action", ""))
+        self._deliver(job, self._aborted_result(job, "timeout", state))
+
+    def _abort(self, job, reason):
+        """İşi iptal et (kilit tutulurken). Sıradaysa hiç başlamaz;
+        çalışıyorsa handler iptal sinyalini görür, kaynakları bitince bırakılır."""
+        job.context.cancel(reason)
+        if job.state == "queued":
+            self._waiting.remove(job)
+            for name in job.resources:
+                self._queues[name].remove(job)
+            self._start_ready()
+
+    @staticmethod
+    def _aborted_result(job, reason, state):
+        context = job.context
+        if reason == "timeout":
+            message = f"Command exceeded deadline of {context.deadline_ms} ms"
+        else:
+            message = "Command cancelled"
+        print(f"  ✗ {message}: {job.cmd_data.get('action', '')} (id: {context.cmd_id}, {state})")
+        return {
+            "status": "timeout" if reason == "timeout" else "cancelled",
+            "message": message,
+            "action": job.cmd_data.get("action", ""),
+            "state": state,
+            "deadline_ms": context.deadline_ms,
+            "elapsed_ms": context.elapsed_ms(),
+            "command_id": context.cmd_id,
+            "timestamp": datetime.now().isoformat()
+        }
+
+    def _start_ready(self):
+        """Tüm kaynak kuyruklarının başında olan işleri havuza gönder (kilit tutulurken)"""
+        still_waiting = []
+        for job in self._waiting:
+            if all(self._queues[name][0] is job for name in job.resources):
+                job.state = "running"
+                self._pool.submit(self._execute, job)
+            else:
+                still_waiting.append(job)
+        self._waiting = still_waiting
+
+    def _execute(self, job):
+        set_context(job.context)
+        try:
+            result = self._run(job.cmd_data)
+        except Exception as e:
+            result = {"status": "error", "message": str(e)}
+        finally:
+            set_context(None)
+            with self._lock:
+                for name in job.resources:
+                    self._queues[name].popleft()
+                self._start_ready()
+        self._deliver(job, result)
+
+    def _deliver(self, job, result):
+        """Sonucu bir kez teslim et (timeout/iptal sonrası gelen geç sonuç atılır)"""
+        with self._lock:
+            if job.state == "done":
+                return
+            job.state = "done"
+            cmd_id = job.cmd_data.get("id", "")
+            if self._active.get(cmd_id) is job:
+                del self._active[cmd_id]
+        if job.timer:
+            job.timer.cancel()
+
+        job.future.set_result(result)
+        if job.callback:
+            try:
+                job.callback(result)
+            except Exception as e:
+                print(f"  ✗ Result delivery failed: {e}")
+
+    def shutdown(self, wait=True):
+        self._pool.shutdown(wait=wait)
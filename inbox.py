@@ -0,0 +1,259 @@
+"""
+Komut kuyruğu (spool dizini) + işlenmiş id günlüğü
+==================================================
+İstemciler inbox/ dizinine her komut için ayrı bir JSON dosyası bırakır
+(önce .tmp olarak yazıp rename etmeleri önerilir). Bridge dosyaları ad
+sırasına göre işler, her sonucu results/<id>.json olarak yazar ve id'yi
+processed.jsonl günlüğüne kaydeder - restart sonrası hiçbir komut tekrar
+çalıştırılmaz ya da sessizce kaybolmaz.
+"""
+
+import os
+import re
+import json
+import time
+import threading
+from collections import OrderedDict
+
+# ============== AYARLAR ==============
+BRIDGE_DIR = os.path.dirname(os.path.abspath(__file__))
+INBOX_DIR = os.path.join(BRIDGE_DIR, "inbox")
+RESULTS_DIR = os.path.join(BRIDGE_DIR, "results")
+JOURNAL_FILE = os.path.join(BRIDGE_DIR, "processed.jsonl")
+
+JOURNAL_KEEP = 10000        # Günlükte tutulacak en fazla id
+PARTIAL_GRACE = 2.0         # Parse edilemeyen dosyaya yazım için tanınan süre (s)
+RESULT_TTL = 24 * 3600      # Bu süreden eski sonuç dosyaları açılışta silinir
+
+
+def write_json_atomic(path, data, indent=2):
+    """JSON'u önce geçici dosyaya yaz, sonra rename et (okuyucu yarım dosya görmez)"""
+    tmp = f"{path}.{threading.get_ident()}.tmp"  # Worker thread'leri aynı dosyaya yazabilir
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=indent, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def safe_id(cmd_id):
+    """Komut id'sini dosya adına uygun hale getir"""
+    return re.sub(r"[^A-Za-z0-9._-]", "_", str(cmd_id))[:128] or "_"
+
+
+# ============== GÜNLÜK ==============
+class ProcessedJournal:
+    """Append-only id günlüğü: her komut için 'started' ve 'done' kaydı"""
+
+    def __init__(self, path=JOURNAL_FILE):
+        self.path = path
+        self.states = OrderedDict()  # id -> "started" | "done"
+        self._lock = threading.Lock()
+        self._load()
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def _load(self):
+        """Günlüğü oku ve son JOURNAL_KEEP kayda sıkıştır"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # Çökme sırasında yarım kalmış satır
+                self.states[entry["id"]] = entry["state"]
+                self.states.move_to_end(entry["id"])
+        while len(self.states) > JOURNAL_KEEP:
+            self.states.popitem(last=False)
+
+        tmp = f"{self.path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            for cmd_id, state in self.states.items():
+                f.write(json.dumps({"id": cmd_id, "state": state}) + "\n")
+        os.replace(tmp, self.path)
+
+    def _append(self, cmd_id, state):
+        with self._lock:
+            self.states[cmd_id] = state
+            self.states.move_to_end(cmd_id)
+            self._file.write(json.dumps({"id": cmd_id, "state": state}) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def mark_started(self, cmd_id):
+        """Komut kabul edildi (çalıştırılmak üzere sıraya alındı)"""
+        self._append(cmd_id, "started")
+
+    def mark_done(self, cmd_id):
+        self._append(cmd_id, "done")
+
+    def state(self, cmd_id):
+        return self.states.get(cmd_id)
+
+
+# ============== INBOX ==============
+class Inbox:
+    """inbox/ dizinindeki komutları sırayla işle, sonuçları results/'a yaz"""
+
+    def __init__(self, journal, inbox_dir=INBOX_DIR, results_dir=RESULTS_DIR):
+        self.journal = journal
+        self.inbox_dir = inbox_dir
+        self.results_dir = results_dir
+        self._inflight = set()  # Çalışmakta olan komut dosyaları
+        self._running = set()   # Çalışmakta olan komut id'leri (tekrar id tespiti)
+        self._lock = threading.Lock()
+        os.makedirs(self.inbox_dir, exist_ok=True)
+        os.makedirs(self.results_dir, exist_ok=True)
+        self._prune_results()
+        self._leftover = set(self.pending())  # Restart öncesinden kalan dosyalar
+
+    def _prune_results(self):
+        """Eski sonuç dosyalarını temizle"""
+        cutoff = time.time() - RESULT_TTL
+        for entry in os.scandir(self.results_dir):
+            try:
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+            except OSError:
+                pass
+
+    def pending(self):
+        """Bekleyen komut dosyaları (ad sırasına göre)"""
+        names = [
+            entry.name for entry in os.scandir(self.inbox_dir)
+            if entry.is_file() and entry.name.endswith(".json") and not entry.name.startswith(".")
+        ]
+        return [os.path.join(self.inbox_dir, name) for name in sorted(names)]
+
+    def result_path(self, cmd_id):
+        return os.path.join(self.results_dir, f"{safe_id(cmd_id)}.json")
+
+    def write_result(self, cmd_id, result):
+        write_json_atomic(self.result_path(cmd_id), result)
+
+    def duplicate_path(self, cmd_id):
+        """Reddedilen tekrar id'nin hata dosyası - asıl sonucun üstüne yazılmaz"""
+        return os.path.join(self.results_dir, f"{safe_id(cmd_id)}.duplicate.json")
+
+    def duplicate_error(self, cmd_id, rerun=False):
+        """Id hâlâ çalışıyorsa ya da (rerun olmadan) daha önce işlendiyse hata sonucu, yoksa None"""
+        with self._lock:
+            running = cmd_id in self._running
+        if running:
+            reason = "is still running"
+        elif not rerun and self.journal.state(cmd_id) == "done":
+            reason = "was already processed"
+        else:
+            return None
+        return {
+            "status": "error",
+            "error": "duplicate_id",
+            "message": f"Duplicate command id {cmd_id}: a command with this id {reason}; not executed",
+            "command_id": cmd_id
+        }
+
+    def submit(self, cmd_id, cmd_data, dispatch, on_result=None, rerun=False):
+        """Tek komutu günlük kaydıyla çalıştırıcıya gönder (önce duplicate_error
+        ile kontrol edilmeli). rerun=True: günlükteki eski kayıt yok sayılır
+        (id'yi yeniden kullanan istemciler).
+        dispatch(cmd_data, callback) komutu çalıştırıp sonucu callback'e verir;
+        dispatch hata fırlatırsa da hata sonucu yazılır ve komut kapanır."""
+        state = None if rerun else self.journal.state(cmd_id)
+        with self._lock:
+            self._running.add(cmd_id)
+
+        def finish(result):
+            self.write_result(cmd_id, result)
+            self.journal.mark_done(cmd_id)
+            with self._lock:
+                self._running.discard(cmd_id)
+            if on_result:
+                on_result(result)
+
+        if state == "started":
+            # Önceki çalışma yarıda kaldı - yan etkili olabilir, tekrar çalıştırma
+            finish({
+                "status": "error",
+                "message": "Interrupted by bridge restart; command was not re-executed",
+                "command_id": cmd_id
+            })
+            return
+
+        try:
+            self.journal.mark_started(cmd_id)
+            dispatch(cmd_data, finish)
+        except Exception as e:
+            finish({
+                "status": "error",
+                "message": f"Command could not be dispatched: {e}",
+                "command_id": cmd_id
+            })
+
+    def drain(self, dispatch):
+        """Bekleyen tüm komutları sırayla çalıştırıcıya gönder. Gönderilen komut sayısını döndürür."""
+        submitted = 0
+        for path in self.pending():
+            with self._lock:
+                if path in self._inflight:
+                    continue
+            name = os.path.basename(path)
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    cmd_data = json.load(f)
+            except FileNotFoundError:
+                continue
+            except (ValueError, UnicodeDecodeError) as e:
+                # Yazım sürüyor olabilir; süre dolduysa bozuk kabul et
+                try:
+                    age = time.time() - os.path.getmtime(path)
+                except OSError:
+                    continue
+                if age < PARTIAL_GRACE:
+                    break  # Sırayı koru - sonraki komutlara geçme
+                self._reject(path, f"Invalid command file {name}: {e}")
+                continue
+            if not isinstance(cmd_data, dict):
+                self._reject(path, f"Invalid command file {name}: expected a JSON object")
+                continue
+
+            cmd_id = str(cmd_data.get("id") or name[:-len(".json")])
+            cmd_data["id"] = cmd_id
+
+            error = self.duplicate_error(cmd_id)
+            if error:
+                # Sonucu yazılıp silinemeden kalmış dosya (çökme) tekrar raporlanmaz
+                if not self._answered(cmd_id, path):
+                    error["file"] = name
+                    write_json_atomic(self.duplicate_path(cmd_id), error)
+                self._remove(path)
+                continue
+
+            with self._lock:
+                self._inflight.add(path)
+            self.submit(cmd_id, cmd_data, dispatch, on_result=lambda _, path=path: self._remove(path))
+            submitted += 1
+        return submitted
+
+    def _reject(self, path, message):
+        """Çalıştırılamayan komut dosyası: hata sonucu yaz, .bad olarak kenara koy"""
+        cmd_id = os.path.basename(path)[:-len(".json")]
+        self.write_result(cmd_id, {"status": "error", "message": message, "command_id": cmd_id})
+        os.replace(path, f"{path}.bad")
+
+    def _answered(self, cmd_id, path):
+        """Restart öncesinden kalan dosyanın, kendisinden sonra yazılmış bir sonucu var mı"""
+        if path not in self._leftover:
+            return False
+        try:
+            return os.path.getmtime(self.result_path(cmd_id)) >= os.path.getmtime(path)
+        except OSError:
+            return False
+
+    def _remove(self, path):
+        """Sonucu yazılan komut dosyasını kuyruktan sil"""
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        with self._lock:
+            self._inflight.discard(path)
+            self._leftover.discard(path)
@@ -2,22 +2,114 @@
 Claude Desktop Bridge - Plugin System
 ======================================
 Her plugin ACTIONS dict'i export eder.
+
+Plugin'ler açılışta import edilmez: MANIFEST hangi action'ın hangi
+modülde olduğunu söyler, modül ilk kullanımda yüklenir (selenium,
+pyautogui, PIL gibi ağır bağımlılıklar ilk komuta kadar beklemez).
+Paylaşımlı kaynak kullanan action'ların kaynakları da burada, RESOURCES
+içinde durur ("input" = mouse/klavye, "screen" = screenshot manager,
+"browser" = Selenium): çalıştırıcı komutu sıraya alırken bunlara bakar,
+bu yüzden modül import edilmeden bilinmeleri gerekir.
+Yeni action eklerken MANIFEST'i (ve gerekiyorsa RESOURCES'ı) güncelleyin.
 """
 
-from . import screenshot
-from . import mouse
-from . import keyboard
-from . import window
-from . import accessibility
-from . import system
-from . import web
+import importlib
+import threading
+from collections.abc import Mapping
+
+# plugin modülü -> sağladığı action'lar
+MANIFEST = {
+    "screenshot": ("screenshot", "capture_ring", "crop", "screenshot_tile"),
+    "mouse": ("click", "move", "scroll", "mouse", "drag"),
+    "keyboard": ("type", "type_raw", "key"),
+    "macro": ("input_sequence",),
+    "window": ("window_move", "window_resize", "window_position", "windows_list", "scroll_app"),
+    "accessibility": ("get_ui_elements", "click_element"),
+    "system": ("run", "terminal_run", "screen", "status"),
+    "metrics": ("metrics",),
+    "vision": ("find_image", "wait_screen_stable", "wait_screen_change", "find_text"),
+    "web": (
+        "web_open", "web_close", "web_goto", "web_find", "web_click", "web_type",
+        "web_text", "web_exists", "web_wait", "web_screenshot", "web_source",
+        "web_elements", "web_execute", "web_info", "web_scroll",
+    ),
+}
+
+# action -> kilitlediği paylaşımlı kaynaklar (eşzamanlı çalıştırma için)
+RESOURCES = {
+    "screenshot": ("screen",),
+    "crop": ("screen",),
+    "screenshot_tile": ("screen",),
+    "click": ("input",),
+    "move": ("input",),
+    "scroll": ("input",),
+    "drag": ("input",),
+    "type": ("input",),
+    "type_raw": ("input",),
+    "key": ("input",),
+    "input_sequence": ("input",),
+    "window_move": ("input",),
+    "window_resize": ("input",),
+    "scroll_app": ("input",),
+    "click_element": ("input",),
+    "find_image": ("screen",),
+    "wait_screen_stable": ("screen",),
+    "wait_screen_change": ("screen",),
+    "find_text": ("screen",),
+    # Tüm web action'ları aynı Selenium session'ını kullanır
+    **{name: ("browser",) for name in MANIFEST["web"]},
+}
+
+
+class PluginRegistry(Mapping):
+    """action adı → handler; plugin modülünü ilk erişimde import eder"""
+
+    def __init__(self, manifest, resources):
+        self._resources = resources
+        self._module_of = {
+            action: module_name
+            for module_name, actions in manifest.items()
+            for action in actions
+        }
+        self._modules = {}
+        self._lock = threading.Lock()
+
+    def module(self, module_name):
+        """Plugin modülünü yükle (zaten yüklüyse önbellekten)"""
+        module = self._modules.get(module_name)
+        if module is None:
+            with self._lock:
+                module = self._modules.get(module_name)
+                if module is None:
+                    module = importlib.import_module(f".{module_name}", __name__)
+                    self._modules[module_name] = module
+        return module
+
+    def __getitem__(self, action):
+        module = self.module(self._module_of[action])
+        return module.ACTIONS[action]
+
+    def __contains__(self, action):
+        return action in self._module_of
+
+    def __iter__(self):
+        return iter(self._module_of)
+
+    def __len__(self):
+        return len(self._module_of)
+
+    def resources(self, action):
+        """Action'ın kilitlemesi gereken kaynaklar (modülü yüklemez)"""
+        return self._resources.get(action, ())
+
+    def loaded(self):
+        """Şu ana kadar import edilmiş plugin'ler"""
+        return sorted(self._modules)
+
+
+registry = PluginRegistry(MANIFEST, RESOURCES)
+
 
 def get_all_handlers():
-    """Tüm plugin'lerden handler'ları topla"""
-    handlers = {}
-    
-    for module in [screenshot, mouse, keyboard, window, accessibility, system, web]:
-        if hasattr(module, 'ACTIONS'):
-            handlers.update(module.ACTIONS)
-    
-    return handlers
+    """Tüm plugin action'ları (lazy yüklenen registry)"""
+    return registry
@@ -0,0 +1,93 @@
+"""
+Komut bağlamı - iptal ve süre sınırı (deadline)
+===============================================
+Çalıştırıcı her komut için bir CommandContext oluşturup worker thread'ine
+bağlar. Uzun süren handler'lar check_cancelled() / interruptible_sleep()
+ile iptali fark edip erken çıkar.
+"""
+
+import time
+import threading
+
+
+class CommandCancelled(Exception):
+    """Komut iptal edildi veya süresi doldu"""
+
+    def __init__(self, reason="cancelled"):
+        super().__init__(f"Command {reason}")
+        self.reason = reason
+
+
+class CommandContext:
+    """Tek komutun iptal durumu, deadline'ı ve görüntü teslim varsayılanı"""
+
+    def __init__(self, cmd_id="", deadline_ms=None, delivery=None):
+        self.cmd_id = cmd_id
+        self.deadline_ms = deadline_ms
+        self.delivery = delivery  # None = plugins.delivery.DEFAULT_DELIVERY
+        self.started = time.monotonic()
+        self.deadline = None if deadline_ms is None else self.started + deadline_ms / 1000
+        self.reason = None
+        self._event = threading.Event()
+
+    def cancel(self, reason="cancelled"):
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+
+    @property
+    def cancelled(self):
+        if not self._event.is_set() and self.deadline is not None and time.monotonic() >= self.deadline:
+            self.cancel("timeout")
+        return self._event.is_set()
+
+    def remaining(self):
+        """Deadline'a kalan süre (saniye), deadline yoksa None"""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def elapsed_ms(self):
+        return round((time.monotonic() - self.started) * 1000, 1)
+
+    def check(self):
+        """İptal edildiyse CommandCancelled fırlat"""
+        if self.cancelled:
+            raise CommandCancelled(self.reason)
+
+    def sleep(self, seconds):
+        """İptalle bölünebilen sleep"""
+        remaining = self.remaining()
+        if remaining is not None and remaining < seconds:
+            self._event.wait(remaining)
+            self.cancel("timeout")
+        else:
+            self._event.wait(seconds)
+        self.check()
+
+
+_local = threading.local()
+_NO_CONTEXT = CommandContext()
+
+
+def set_context(context):
+    """Geçerli thread'in komut bağlamını ayarla (None = temizle)"""
+    _local.context = context
+
+
+def current_context():
+    return getattr(_local, "context", None) or _NO_CONTEXT
+
+
+def check_cancelled():
+    current_context().check()
+
+
+def interruptible_sleep(seconds):
+    current_context().sleep(seconds)
+
+
+def time_left(default):
+    """Handler'ın kendi timeout'unu komutun kalan süresiyle sınırla"""
+    remaining = current_context().remaining()
+    return default if remaining is None else min(default, remaining)
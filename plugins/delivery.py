@@ -0,0 +1,106 @@
+"""
+Görüntü teslimi - dosya, inline (base64) veya paylaşımlı bellek
+===============================================================
+Kodlanmış screenshot byte'ları bellekte üretilir; nereye gideceği
+"delivery" seçeneğiyle belirlenir:
+
+  file    screenshots/ altına yaz, sonuçta "path" (dosya protokolü varsayılanı)
+  inline  sonuçta base64 "data" + "mime_type", disk yok (HTTP varsayılanı)
+  shm     paylaşımlı bellek segmentine yaz, sonuçta {"name", "size"}; aynı
+          makinedeki istemci multiprocessing.shared_memory ile kopyasız okur
+
+inline/shm modunda "persist": true ayrıca diske de yazar.
+"""
+
+import os
+import base64
+import atexit
+import threading
+
+from .context import current_context
+from .metrics import metrics
+
+DELIVERY_MODES = ("file", "inline", "shm")
+DEFAULT_DELIVERY = os.environ.get("BRIDGE_SCREENSHOT_DELIVERY", "file")
+SHM_SLOTS = 16  # Dönüşümlü segment sayısı (diff bölgeleri dahil) - okunmadan ezilmesin
+
+
+class SharedMemoryPool:
+    """Dönüşümlü kullanılan sabit sayıda paylaşımlı bellek segmenti"""
+
+    def __init__(self, slots=SHM_SLOTS):
+        self.slots = [None] * slots
+        self.next = 0
+        self._lock = threading.Lock()
+
+    def put(self, data):
+        from multiprocessing import shared_memory
+        with self._lock:
+            index = self.next
+            self.next = (self.next + 1) % len(self.slots)
+            segment = self.slots[index]
+            if segment is None or segment.size < len(data):
+                if segment is not None:
+                    segment.close()
+                    segment.unlink()
+                # Büyüyen karelerde sık yeniden oluşturmamak için pay bırak
+                segment = shared_memory.SharedMemory(create=True, size=max(len(data) * 2, 256 * 1024))
+                self.slots[index] = segment
+            segment.buf[:len(data)] = data
+            return {"name": segment.name, "size": len(data), "slot": index}
+
+    def close(self):
+        with self._lock:
+            for segment in self.slots:
+                if segment is not None:
+                    segment.close()
+                    try:
+                        segment.unlink()
+                    except FileNotFoundError:
+                        pass
+            self.slots = [None] * len(self.slots)
+
+
+shm_pool = SharedMemoryPool()
+atexit.register(shm_pool.close)
+
+
+def options_from_params(params):
+    """Action parametrelerinden teslim seçenekleri (delivery, persist)
+
+    delivery verilmezse komutun kendi varsayılanı (HTTP transport: inline),
+    o da yoksa DEFAULT_DELIVERY kullanılır.
+    """
+    mode = params.get("delivery") or current_context().delivery or DEFAULT_DELIVERY
+    if mode not in DELIVERY_MODES:
+        raise ValueError(f"Unknown delivery: {mode} (use {', '.join(DELIVERY_MODES)})")
+    return {"delivery": mode, "persist": bool(params.get("persist", False))}
+
+
+def split_options(options):
+    """Birleşik çıktı seçenekleri → (encoder seçenekleri, delivery, persist)"""
+    options = dict(options or {})
+    mode = options.pop("delivery", None) or DEFAULT_DELIVERY
+    persist = options.pop("persist", False)
+    return options, mode, persist
+
+
+def writes_file(mode, persist):
+    return mode == "file" or persist
+
+
+def deliver(encoded, path, mode, persist=False):
+    """Kodlanmış görüntüyü teslim et → sonuca eklenecek alanlar"""
+    fields = {"delivery": mode}
+    if writes_file(mode, persist):
+        with metrics.timed("screenshot.write"):
+            with open(path, 'wb') as f:
+                f.write(encoded.data)
+        fields["path"] = path
+    if mode == "inline":
+        fields["mime_type"] = encoded.mime_type
+        fields["data"] = base64.b64encode(encoded.data).decode("ascii")
+    elif mode == "shm":
+        fields["mime_type"] = encoded.mime_type
+        fields["shm"] = shm_pool.put(encoded.data)
+    return fields
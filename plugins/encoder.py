@@ -0,0 +1,225 @@
+"""
+Adaptif görüntü kodlayıcı
+=========================
+Screenshot manager ve web_screenshot'ın ortak kodlama aşaması.
+Her kare için format ve kalite seçer:
+
+  düz UI (az renk)  → palet PNG (metin keskin, küçük)
+  fotoğraf/gradyan  → JPEG (en hızlı); bütçeyi aşarsa WebP daha küçükse WebP
+
+Hedef byte bütçesi (max_bytes) verilirse kalite ikili aramayla
+bütçeye sığana kadar düşürülür. Aynı kare + aynı seçenekler için
+kodlanmış byte'lar küçük bir LRU'da tutulur, farklı çağıranlar
+tekrar kodlamaz.
+"""
+
+import io
+import os
+import time
+import threading
+from collections import OrderedDict
+
+from PIL import Image, features
+
+# ============== AYARLAR ==============
+QUALITY_TIERS = {"low": 40, "medium": 65, "high": 85}
+DEFAULT_FORMAT = os.environ.get("BRIDGE_IMAGE_FORMAT", "auto")  # auto | jpeg | webp | png
+DEFAULT_QUALITY = "medium"
+MIN_QUALITY = 20
+PALETTE_MAX_COLORS = 256    # Küçültülmüş örnekte bundan az renk → "düz UI"
+FLAT_GRAY_LEVELS = 64       # Zaten gri ("L") gelen karede eşik (256 ton her L karede sığar)
+SAMPLE_WIDTH = 250          # Renk sayımı için örnek genişliği
+CACHE_SIZE = 16             # Saklanan kodlanmış kare sayısı
+
+EXTENSIONS = {"jpeg": ".jpg", "webp": ".webp", "png": ".png"}
+WEBP_AVAILABLE = features.check("webp")
+
+
+class EncodedImage:
+    """Kodlanmış kare: byte'lar + seçilen format/kalite + süre"""
+
+    def __init__(self, data, format, quality, encode_ms, grayscale=False, over_budget=False):
+        self.data = data
+        self.format = format
+        self.quality = quality
+        self.encode_ms = encode_ms
+        self.grayscale = grayscale
+        self.over_budget = over_budget
+
+    @property
+    def size(self):
+        return len(self.data)
+
+    @property
+    def extension(self):
+        return EXTENSIONS[self.format]
+
+    @property
+    def mime_type(self):
+        return f"image/{self.format}"
+
+    def info(self):
+        """Sonuca eklenecek özet"""
+        info = {
+            "format": self.format,
+            "quality": self.quality,
+            "bytes": self.size,
+            "encode_ms": self.encode_ms
+        }
+        if self.grayscale:
+            info["grayscale"] = True
+        if self.over_budget:
+            info["over_budget"] = True
+        return info
+
+
+def with_extension(path, encoded):
+    """Dosya yolunun uzantısını seçilen formata göre değiştir"""
+    return os.path.splitext(path)[0] + encoded.extension
+
+
+def resolve_quality(quality):
+    """"low"/"medium"/"high" veya 1-95 arası sayı → JPEG/WebP kalite değeri"""
+    if quality is None:
+        quality = DEFAULT_QUALITY
+    if isinstance(quality, str) and not quality.isdigit():
+        if quality not in QUALITY_TIERS:
+            raise ValueError(f"Unknown quality tier: {quality} (use {', '.join(QUALITY_TIERS)} or 1-95)")
+        return QUALITY_TIERS[quality]
+    return max(MIN_QUALITY, min(95, int(quality)))
+
+
+def is_flat(img):
+    """Az renkli (düz UI) kare mi - küçük bir örnekte renk say"""
+    sample = img
+    if img.width > SAMPLE_WIDTH:
+        factor = img.width // SAMPLE_WIDTH
+        sample = img.reduce(factor)
+    limit = FLAT_GRAY_LEVELS if sample.mode == "L" else PALETTE_MAX_COLORS
+    return sample.getcolors(limit) is not None
+
+
+def _save(img, format, quality):
+    buffer = io.BytesIO()
+    if format == "png":
+        if img.mode not in ("P", "L"):
+            img = img.quantize(colors=PALETTE_MAX_COLORS, method=Image.Quantize.FASTOCTREE)
+        img.save(buffer, "PNG", compress_level=6)
+    elif format == "webp":
+        img.save(buffer, "WEBP", quality=quality, method=2)  # 4+ çok daha yavaş, boyut farkı az
+    else:
+        img.save(buffer, "JPEG", quality=quality, optimize=True)
+    return buffer.getvalue()
+
+
+def _fit_budget(img, format, quality, max_bytes):
+    """Kaliteyi ikili aramayla bütçeye sığdır → (data, quality, sığdı mı)"""
+    data = _save(img, format, quality)
+    if len(data) <= max_bytes:
+        return data, quality, True
+    smallest = (data, quality)
+    low, high = MIN_QUALITY, quality - 1
+    best = None
+    while low <= high:
+        middle = (low + high) // 2
+        candidate = _save(img, format, middle)
+        if len(candidate) <= max_bytes:
+            best = (candidate, middle)
+            low = middle + 1
+        else:
+            if len(candidate) < len(smallest[0]):
+                smallest = (candidate, middle)
+            high = middle - 1
+    if best:
+        return best[0], best[1], True
+    return smallest[0], smallest[1], False
+
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def encode(img, format=None, quality=None, max_bytes=None, grayscale=False, cache_key=None):
+    """Kareyi kodla → EncodedImage
+
+    format: "auto" | "jpeg" | "webp" | "png"
+    quality: kalite katmanı ("low"/"medium"/"high") veya sayı
+    max_bytes: hedef boyut; lossy formatlarda kalite düşürülerek sığdırılır
+    cache_key: karenin kimliği (örn. ham kare hash'i + boyut); verilirse sonuç paylaşılır
+    """
+    format = (format or DEFAULT_FORMAT).lower()
+    if format == "jpg":
+        format = "jpeg"
+    if format not in ("auto",) + tuple(EXTENSIONS):
+        raise ValueError(f"Unknown image format: {format} (use auto, jpeg, webp, png)")
+    if format == "webp" and not WEBP_AVAILABLE:
+        format = "jpeg"
+    quality = resolve_quality(quality)
+
+    lookup = None
+    if cache_key is not None:
+        lookup = (cache_key, format, quality, max_bytes, bool(grayscale))
+        with _cache_lock:
+            cached = _cache.get(lookup)
+            if cached:
+                _cache.move_to_end(lookup)
+                return cached
+
+    start = time.perf_counter()
+    if img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+
+    # Format gri dönüşümden önce seçilir - gri kare her zaman "az renkli" görünür
+    chosen = format
+    if format == "auto":
+        chosen = "png" if is_flat(img) else "jpeg"
+    if grayscale and img.mode != "L":
+        img = img.convert("L")
+
+    over_budget = False
+    if chosen == "png":
+        data = _save(img, "png", quality)
+        used_quality = None
+        if max_bytes and len(data) > max_bytes:
+            # Palet PNG bütçeyi aşıyor - lossy formatla dene
+            if format == "auto":
+                chosen = "jpeg"
+            else:
+                over_budget = True
+    if chosen == "jpeg" and format == "auto" and max_bytes and WEBP_AVAILABLE:
+        # JPEG bütçeyi aşıyorsa aynı kalitede WebP'yi dene, küçük olanla devam et
+        jpeg_size = len(_save(img, "jpeg", quality))
+        if jpeg_size > max_bytes and len(_save(img, "webp", quality)) < jpeg_size:
+            chosen = "webp"
+    if chosen != "png":
+        if max_bytes:
+            data, used_quality, fits = _fit_budget(img, chosen, quality, max_bytes)
+            over_budget = not fits
+        else:
+            data, used_quality = _save(img, chosen, quality), quality
+
+    encoded = EncodedImage(
+        data, chosen, used_quality,
+        encode_ms=round((time.perf_counter() - start) * 1000, 2),
+        grayscale=img.mode == "L", over_budget=over_budget
+    )
+    if lookup is not None:
+        with _cache_lock:
+            _cache[lookup] = encoded
+            while len(_cache) > CACHE_SIZE:
+                _cache.popitem(last=False)
+    return encoded
+
+
+def options_from_params(params):
+    """Action parametrelerinden kodlama seçenekleri (format, quality, max_kb, grayscale)"""
+    options = {}
+    if "format" in params:
+        options["format"] = params["format"]
+    if "quality" in params:
+        options["quality"] = params["quality"]
+    if params.get("max_kb"):
+        options["max_bytes"] = int(float(params["max_kb"]) * 1024)
+    if params.get("grayscale"):
+        options["grayscale"] = True
+    return options
@@ -0,0 +1,312 @@
+"""
+Görüntü işleme yardımcıları
+===========================
+Screenshot manager'ın piksel düzeyindeki işleri: hızlı küçültme,
+kare özeti (hash), iki kare arasındaki değişen blokları bulma ve bunları
+bounding box'lara toplama, şablon eşleme (find_image), ekranın
+durulmasını izlemek için küçük örnek kareler.
+
+Blok karşılaştırma ve şablon eşleme NumPy ister. NumPy opsiyoneldir:
+yoksa NUMPY_AVAILABLE False olur ve bu fonksiyonları kullanan modlar
+anlamlı bir hata döndürür.
+"""
+
+import os
+import hashlib
+
+from PIL import Image, ImageChops
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+DIFF_BLOCK = 16         # Karşılaştırma blok boyutu (piksel)
+DIFF_TOLERANCE = 16     # Kanal başına bu farkın altı "aynı" sayılır
+MAX_COMPONENTS = 64     # Bundan fazla parça varsa tek kutuda birleştir
+
+MATCH_MIN_SIDE = 6      # Şablon piramidi: en kaba seviyede kısa kenar en az bu kadar
+MATCH_MAX_LEVELS = 3    # Tam çözünürlük + 2 yarıya indirme (1/4; 1/8'de ince doku kayboluyor)
+MATCH_COARSE_SLACK = 0.3   # Kaba seviyede aday eşiği = threshold - bu pay (hizalama kaybı için)
+MATCH_REFINE_RADIUS = 2    # İnce seviyede aday çevresinde aranan piksel
+MATCH_CANDIDATES = 16      # Kaba seviyeden inceltilen ek aday (tekrarlı UI'da doğru tepe kaçmasın)
+
+# Küçültme preset'leri: (Image.reduce ile tamsayı ön-küçültme, son filtre)
+RESIZE_PRESETS = {
+    "speed": (True, Image.BILINEAR),
+    "balanced": (True, Image.LANCZOS),
+    "quality": (False, Image.LANCZOS),   # Tam çözünürlükten LANCZOS (eski yol)
+}
+RESIZE_PRESET = os.environ.get("BRIDGE_RESIZE_PRESET", "balanced")
+
+
+def require_numpy():
+    if not NUMPY_AVAILABLE:
+        raise RuntimeError("numpy not installed. Run: pip install numpy")
+
+
+def resize(img, width, height, preset=None):
+    """img'yi (width, height)'a küçült
+
+    Ön-küçültme: Image.reduce(n) n x n blok ortalaması alır (ucuz ve
+    aliasing'siz); hedefin altına inmeyen en büyük tamsayı n ile kare
+    küçültülür, son filtre sadece kalan < 2x oranı işler. 4K → 1000 px'te
+    LANCZOS süresinin yaklaşık üçte biri.
+    """
+    preset = preset or RESIZE_PRESET
+    if preset not in RESIZE_PRESETS:
+        raise ValueError(f"Unknown resize preset: {preset} (use {', '.join(RESIZE_PRESETS)})")
+    pre_reduce, resample = RESIZE_PRESETS[preset]
+    if pre_reduce:
+        factor = min(img.width // width, img.height // height)
+        if factor >= 2:
+            img = img.reduce(factor)
+    if img.size == (width, height):
+        return img
+    return img.resize((width, height), resample)
+
+
+def frame_digest(img):
+    """Ham piksellerin hızlı özeti (1080p'de ~10 ms) - aynı kare tespiti için"""
+    digest = hashlib.sha1(img.tobytes())
+    digest.update(f"{img.mode}{img.size}".encode())
+    return digest.hexdigest()
+
+
+def to_array(img):
+    """PIL Image → (H, W, C) uint8 dizi (kopyasız mümkünse)"""
+    return np.asarray(img)
+
+
+def changed_blocks(previous, current, block=DIFF_BLOCK, tolerance=DIFF_TOLERANCE):
+    """İki eşit boyutlu kare → blok ızgarası üzerinde değişim maskesi (bool, hb x wb)"""
+    a, b = to_array(previous), to_array(current)
+    # uint8 üzerinde |a - b| (int16'ya genişletmeden)
+    diff = np.maximum(a, b) - np.minimum(a, b)
+    height, width = diff.shape[:2]
+    channels = diff.shape[2] if diff.ndim == 3 else 1
+    rows = diff.reshape(height, width * channels)
+
+    # Önce satır blokları (bellekte bitişik, hızlı), sonra sütun blokları + kanallar
+    full = height // block * block
+    reduced = rows[:full].reshape(full // block, block, -1).max(axis=1)
+    if full < height:
+        reduced = np.vstack([reduced, rows[full:].max(axis=0, keepdims=True)])
+    wb = -(-width // block)
+    pad = wb * block * channels - reduced.shape[1]
+    if pad:
+        reduced = np.pad(reduced, ((0, 0), (0, pad)))
+    return reduced.reshape(reduced.shape[0], wb, block * channels).max(axis=2) > tolerance
+
+
+def _components(mask):
+    """8-komşulu bağlı blok grupları → [(bx0, by0, bx1, by1)] (blok ızgarasında, dahil-hariç)"""
+    remaining = {(int(y), int(x)) for y, x in np.argwhere(mask)}
+    boxes = []
+    while remaining:
+        stack = [remaining.pop()]
+        y0 = y1 = stack[0][0]
+        x0 = x1 = stack[0][1]
+        while stack:
+            y, x = stack.pop()
+            y0, y1, x0, x1 = min(y0, y), max(y1, y), min(x0, x), max(x1, x)
+            for dy in (-1, 0, 1):
+                for dx in (-1, 0, 1):
+                    cell = (y + dy, x + dx)
+                    if cell in remaining:
+                        remaining.remove(cell)
+                        stack.append(cell)
+        boxes.append([x0, y0, x1 + 1, y1 + 1])
+    return boxes
+
+
+def _merge_close(boxes, gap):
+    """Aralarında gap bloktan az boşluk olan kutuları birleştir"""
+    merged = True
+    while merged and len(boxes) > 1:
+        merged = False
+        result = []
+        for box in boxes:
+            for other in result:
+                if (box[0] <= other[2] + gap and other[0] <= box[2] + gap and
+                        box[1] <= other[3] + gap and other[1] <= box[3] + gap):
+                    other[0], other[1] = min(other[0], box[0]), min(other[1], box[1])
+                    other[2], other[3] = max(other[2], box[2]), max(other[3], box[3])
+                    merged = True
+                    break
+            else:
+                result.append(box)
+        boxes = result
+    return boxes
+
+
+def block_regions(mask, block=DIFF_BLOCK, size=None, max_regions=8):
+    """Değişim maskesi → piksel cinsinden [(x, y, w, h)] kutular (en büyük önce)
+
+    Yakın parçalar birleştirilir; max_regions aşılırsa hepsi tek kutuda toplanır.
+    """
+    if not mask.any():
+        return []
+    boxes = _components(mask)
+    if len(boxes) > MAX_COMPONENTS:
+        boxes = [[min(b[0] for b in boxes), min(b[1] for b in boxes),
+                  max(b[2] for b in boxes), max(b[3] for b in boxes)]]
+    boxes = _merge_close(boxes, gap=1)
+    if len(boxes) > max_regions:
+        boxes = _merge_close(boxes, gap=max(mask.shape))
+
+    width, height = size if size else (mask.shape[1] * block, mask.shape[0] * block)
+    regions = []
+    for x0, y0, x1, y1 in boxes:
+        x, y = x0 * block, y0 * block
+        regions.append((x, y, min(x1 * block, width) - x, min(y1 * block, height) - y))
+    regions.sort(key=lambda r: r[2] * r[3], reverse=True)
+    return regions
+
+
+# ============== ÖRNEK KARELER (ekran durulması) ==============
+def sample_frame(img, width):
+    """Hızlı karşılaştırma için küçük gri kopya (Image.reduce, NumPy gerekmez)"""
+    factor = max(1, img.width // width)
+    small = img.reduce(factor) if factor > 1 else img
+    return small.convert("L")
+
+
+def sample_change(previous, current, tolerance=DIFF_TOLERANCE):
+    """İki örnek kare → (değişen piksel oranı, değişim kutusu (x0, y0, x1, y1) veya None)"""
+    if previous.size != current.size:
+        return 1.0, (0, 0) + current.size
+    mask = ImageChops.difference(previous, current).point(lambda v: 255 if v > tolerance else 0)
+    changed = mask.histogram()[255]
+    return changed / (current.width * current.height), mask.getbbox()
+
+
+# ============== ŞABLON EŞLEME ==============
+def gray_pyramid(img, levels):
+    """PIL → [uint8 gri dizi]; 0 = tam çözünürlük, her seviye Image.reduce(2)
+
+    uint8 tutulur: ince seviyelerde sadece küçük pencereler float'a çevrilir.
+    """
+    gray = img.convert("L")
+    pyramid = [np.asarray(gray)]
+    for _ in range(levels - 1):
+        if min(gray.size) < 2:
+            break
+        gray = gray.reduce(2)
+        pyramid.append(np.asarray(gray))
+    return pyramid
+
+
+class TemplatePyramid:
+    """Eşlemeye hazır şablon: her seviyede sıfır ortalamalı gri dizi + normu"""
+    
+    def __init__(self, img, max_levels=MATCH_MAX_LEVELS):
+        self.size = img.size
+        levels = 1
+        while levels < max_levels and min(img.size) >> levels >= MATCH_MIN_SIDE:
+            levels += 1
+        self.levels = []
+        for gray in gray_pyramid(img, levels):
+            gray = gray.astype(np.float32)
+            zero = gray - gray.mean()
+            norm = float(np.sqrt((zero * zero).sum()))
+            if norm < 1e-3:
+                raise ValueError("Template has no contrast (single colour)")
+            self.levels.append((zero, norm))
+
+
+def _window_sums(a, h, w):
+    """Her (h, w) penceresinin toplamı (integral görüntü, float64)"""
+    c = np.pad(a, ((1, 0), (1, 0))).cumsum(0).cumsum(1)
+    return c[h:, w:] - c[:-h, w:] - c[h:, :-w] + c[:-h, :-w]
+
+
+def ncc_map(search, zero, norm):
+    """Sıfır ortalamalı normalize çapraz korelasyon (ZNCC) haritası, FFT ile
+    
+    Sonuç (H-h+1, W-w+1); 1 = birebir, düz (kontrastsız) pencereler 0.
+    """
+    h, w = zero.shape
+    height, width = search.shape
+    if height < h or width < w:
+        return None
+    search = search.astype(np.float32)
+    spectrum = np.fft.rfft2(search) * np.conj(np.fft.rfft2(zero, s=search.shape))
+    corr = np.fft.irfft2(spectrum, s=search.shape)[:height - h + 1, :width - w + 1]
+    wide = search.astype(np.float64)
+    n = h * w
+    sums = _window_sums(wide, h, w)
+    variance = _window_sums(wide * wide, h, w) - sums * sums / n
+    denominator = np.sqrt(np.maximum(variance, 0)) * norm
+    score = np.zeros_like(corr)
+    np.divide(corr, denominator, out=score, where=variance > n)  # std < 1 gri seviye → düz
+    return score
+
+
+def _peaks(score, min_score, limit, h, w):
+    """En yüksek skorlu tepeler; her seçilenin çevresi (şablonun yarısı) bastırılır"""
+    score = score.copy()
+    peaks = []
+    while len(peaks) < limit:
+        y, x = np.unravel_index(int(score.argmax()), score.shape)
+        value = float(score[y, x])
+        if value < min_score:
+            break
+        peaks.append((int(y), int(x), value))
+        score[max(0, y - h // 2):y + h // 2 + 1, max(0, x - w // 2):x + w // 2 + 1] = -1
+    return peaks
+
+
+def _refine(search, zero, norm, y, x, radius=MATCH_REFINE_RADIUS):
+    """(y, x) çevresinde ±radius piksellik pencerede doğrudan ZNCC → en iyi (y, x, skor)"""
+    h, w = zero.shape
+    y0, x0 = max(0, y - radius), max(0, x - radius)
+    y1 = min(search.shape[0] - h, y + radius)
+    x1 = min(search.shape[1] - w, x + radius)
+    if y1 < y0 or x1 < x0:
+        return y, x, -1.0
+    patch = search[y0:y1 + h, x0:x1 + w].astype(np.float32)
+    windows = np.lib.stride_tricks.sliding_window_view(patch, (h, w))
+    corr = np.einsum("ijkl,kl->ij", windows, zero, dtype=np.float64)
+    n = h * w
+    sums = windows.sum(axis=(2, 3), dtype=np.float64)
+    variance = np.einsum("ijkl,ijkl->ij", windows, windows, dtype=np.float64) - sums * sums / n
+    score = np.zeros_like(corr)
+    np.divide(corr, np.sqrt(np.maximum(variance, 0)) * norm, out=score, where=variance > n)
+    dy, dx = np.unravel_index(int(score.argmax()), score.shape)
+    return y0 + int(dy), x0 + int(dx), float(score[dy, dx])
+
+
+def match_template(search_levels, template, threshold=0.8, max_results=1):
+    """Kabadan inceye şablon arama → [(x, y, w, h, skor)] tam çözünürlük pikselinde
+    
+    En kaba ortak seviyede tüm görüntü FFT ile taranır; eşiğe yakın adaylar
+    her ince seviyede sadece çevrelerinde yeniden puanlanır. Böylece 1080p'de
+    tam çözünürlükte arama yerine ~1/16'lık bir alan + birkaç küçük pencere.
+    """
+    top = min(len(template.levels), len(search_levels)) - 1
+    zero, norm = template.levels[top]
+    score = ncc_map(search_levels[top], zero, norm)
+    if score is None:
+        return []
+    h, w = zero.shape
+    if top:
+        candidates = _peaks(score, threshold - MATCH_COARSE_SLACK, max_results * 4 + MATCH_CANDIDATES, h, w)
+    else:
+        candidates = _peaks(score, threshold, max_results, h, w)
+    
+    width, height = template.size
+    hits = []
+    for y, x, value in candidates:
+        for level in range(top - 1, -1, -1):
+            y, x, value = _refine(search_levels[level], *template.levels[level], 2 * y, 2 * x)
+        if value < threshold:
+            continue
+        # Farklı adaylar aynı yere yakınsayabilir
+        if any(abs(x - hx) < width / 2 and abs(y - hy) < height / 2 for hx, hy, _, _, _ in hits):
+            continue
+        hits.append((x, y, width, height, value))
+    hits.sort(key=lambda hit: hit[4], reverse=True)
+    return hits[:max_results]
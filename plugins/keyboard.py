@@ -5,8 +5,10 @@ Keyboard Plugin
 import sys
 import pyautogui
 from .shared import type_with_clipboard
+from .vision import observable
 
 
+@observable
 def type_text(params):
     """Metin yaz (clipboard ile, Unicode destekli)"""
     text = params.get("text", "")
@@ -14,6 +16,7 @@ def type_text(params):
     return {"status": "success", "action": "type", "length": len(text), "method": "clipboard"}
 
 
+@observable
 def type_raw(params):
     """Metin yaz (pyautogui ile, sadece ASCII)"""
     text = params.get("text", "")
@@ -22,26 +25,25 @@ def type_raw(params):
     return {"status": "success", "action": "type_raw", "length": len(text), "method": "pyautogui"}
 
 
+def normalize_keys(key_name):
+    """"ctrl+shift+t" → ["ctrl", "shift", "t"] (cmd → macOS'ta command, diğerlerinde ctrl)"""
+    normalized_keys = []
+    for k in key_name.split('+'):
+        k_lower = k.lower().strip()
+        if k_lower in ('cmd', 'command'):
+            normalized_keys.append('command' if sys.platform == 'darwin' else 'ctrl')
+        else:
+            normalized_keys.append(k_lower)
+    return normalized_keys
+
+
+@observable
 def key(params):
     """Tuş bas"""
     key_name = params.get("key", "")
     
     if '+' in key_name:
-        keys = key_name.split('+')
-        normalized_keys = []
-        for k in keys:
-            k_lower = k.lower().strip()
-            if k_lower in ('cmd', 'command'):
-                normalized_keys.append('command' if sys.platform == 'darwin' else 'ctrl')
-            elif k_lower == 'ctrl':
-                normalized_keys.append('ctrl')
-            elif k_lower == 'alt':
-                normalized_keys.append('alt')
-            elif k_lower == 'shift':
-                normalized_keys.append('shift')
-            else:
-                normalized_keys.append(k_lower)
-        pyautogui.hotkey(*normalized_keys)
+        pyautogui.hotkey(*normalize_keys(key_name))
     else:
         pyautogui.press(key_name)
     
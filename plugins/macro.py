@@ -0,0 +1,150 @@
+"""
+Macro Plugin - input_sequence
+=============================
+Düşük seviyeli giriş olaylarını (move/down/up/click/scroll/key/text/delay)
+arka arkaya oynatır. pyautogui her çağrıdan sonra PAUSE (0.1 s) uyur;
+burada tüm çağrılar _pause=False ile yapılır, bekleme sadece açık
+"delay" olaylarıyla olur. 20 adımlık form doldurma saniyeler yerine
+milisaniyeler sürer.
+"""
+
+import sys
+import time
+import pyautogui
+
+from .shared import screenshot_mgr, clipboard_copy
+from .context import check_cancelled, interruptible_sleep
+from .keyboard import normalize_keys
+from .vision import observable
+
+MAX_EVENTS = 1000
+
+
+class _Player:
+    """Olayları oynatır; basılı kalan tuş/düğmeleri hata veya iptalde bırakır"""
+
+    def __init__(self, screenshot_id=None, screenshot_coords=False):
+        self.screenshot_id = screenshot_id
+        self.screenshot_coords = screenshot_coords or bool(screenshot_id)
+        self.buttons = set()
+        self.keys = []
+
+    def _point(self, event):
+        """Olayın (x, y)'si → ekran koordinatı; verilmemişse (None, None) = mevcut konum"""
+        x, y = event.get("x"), event.get("y")
+        if x is None or y is None:
+            return None, None
+        screenshot_id = event.get("screenshot_id", self.screenshot_id)
+        if event.get("screenshot_coords", self.screenshot_coords) or screenshot_id:
+            return screenshot_mgr.convert_coords(x, y, screenshot_id)
+        return x, y
+
+    def play(self, event):
+        if not isinstance(event, dict):
+            raise ValueError("event must be an object")
+        kind = event.get("type")
+        if kind == "move":
+            x, y = self._point(event)
+            pyautogui.moveTo(x, y, _pause=False)
+        elif kind == "down":
+            x, y = self._point(event)
+            button = event.get("button", "left")
+            pyautogui.mouseDown(x, y, button=button, _pause=False)
+            self.buttons.add(button)
+        elif kind == "up":
+            x, y = self._point(event)
+            button = event.get("button", "left")
+            pyautogui.mouseUp(x, y, button=button, _pause=False)
+            self.buttons.discard(button)
+        elif kind == "click":
+            x, y = self._point(event)
+            pyautogui.click(x, y, clicks=event.get("clicks", 1), button=event.get("button", "left"),
+                            _pause=False)
+        elif kind == "scroll":
+            x, y = self._point(event)
+            pyautogui.scroll(event.get("amount", -3), x=x, y=y, _pause=False)
+        elif kind == "key":
+            keys = normalize_keys(event.get("key", ""))
+            if len(keys) > 1:
+                pyautogui.hotkey(*keys, _pause=False)
+            else:
+                pyautogui.press(keys[0], _pause=False)
+        elif kind == "key_down":
+            name = normalize_keys(event.get("key", ""))[0]
+            pyautogui.keyDown(name, _pause=False)
+            self.keys.append(name)
+        elif kind == "key_up":
+            name = normalize_keys(event.get("key", ""))[0]
+            pyautogui.keyUp(name, _pause=False)
+            if name in self.keys:
+                self.keys.remove(name)
+        elif kind == "text":
+            text = event.get("text", "")
+            if text.isascii():
+                pyautogui.write(text, interval=event.get("interval_ms", 0) / 1000, _pause=False)
+            else:
+                # Unicode: clipboard + yapıştır (bekleme yok; gerekirse ardından delay ekleyin)
+                clipboard_copy(text)
+                pyautogui.hotkey('command' if sys.platform == 'darwin' else 'ctrl', 'v', _pause=False)
+        elif kind == "delay":
+            interruptible_sleep(event.get("ms", 0) / 1000)
+        else:
+            raise ValueError(f"Unknown event type: {kind}")
+
+    def release(self):
+        """Basılı kalanları bırak (yarım kalan sürükleme / modifier takılı kalmasın)"""
+        for name in reversed(self.keys):
+            pyautogui.keyUp(name, _pause=False)
+        for button in self.buttons:
+            pyautogui.mouseUp(button=button, _pause=False)
+        self.keys, self.buttons = [], set()
+
+
+@observable
+def input_sequence(params):
+    """Giriş olaylarını arka arkaya oynat (örtük pyautogui beklemesi yok)
+
+    {"events": [
+        {"type": "click", "x": 400, "y": 300},
+        {"type": "text", "text": "hello"},
+        {"type": "key", "key": "tab"},
+        {"type": "delay", "ms": 50},
+        {"type": "down", "x": 100, "y": 100}, {"type": "move", "x": 300, "y": 100}, {"type": "up"}
+    ], "screenshot_id": "s12"}
+    Koordinatlar screenshot_id / screenshot_coords ile (sıra veya olay başına) dönüştürülür.
+    """
+    events = params.get("events")
+    if not isinstance(events, list) or not events:
+        return {"status": "error", "message": "events required (list of {type, ...})"}
+    if len(events) > MAX_EVENTS:
+        return {"status": "error", "message": f"Too many events: {len(events)} (max {MAX_EVENTS})"}
+
+    player = _Player(params.get("screenshot_id"), params.get("screenshot_coords", False))
+    start = time.perf_counter()
+    index = 0
+    try:
+        for index, event in enumerate(events):
+            check_cancelled()
+            player.play(event)
+    except (ValueError, KeyError, IndexError, OSError, pyautogui.FailSafeException) as e:
+        return {
+            "status": "error",
+            "message": f"Event {index + 1}: {e}",
+            "completed": index
+        }
+    finally:
+        player.release()
+
+    return {
+        "status": "success",
+        "action": "input_sequence",
+        "events": len(events),
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+        "position": list(pyautogui.position())
+    }
+
+
+# Dışa açılan action'lar
+ACTIONS = {
+    "input_sequence": input_sequence,
+}
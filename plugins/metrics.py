@@ -0,0 +1,206 @@
+"""
+Metrics Plugin - Action bazlı sayaçlar ve gecikme histogramları
+================================================================
+process_command her action için süre ve durum kaydeder. Pahalı iç
+aşamalar (screenshot capture/resize/encode/write, Selenium çağrıları)
+metrics.timed("...") ile ölçülür. Değerler `metrics` action'ı ile ve
+periyodik olarak yazılan Prometheus text dosyası ile okunur.
+"""
+
+import os
+import time
+import bisect
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+# Histogram sınırları (saniye) - Prometheus "le" etiketleri
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+RESERVOIR_SIZE = 1024      # Yüzdelikler için saklanan son örnek sayısı
+ERROR_STATUSES = ("error", "timeout", "cancelled")
+
+
+class Histogram:
+    """Sabit bucket'lı histogram + yüzdelikler için son N örnek"""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=RESERVOIR_SIZE)
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.recent.append(seconds)
+
+    def summary(self):
+        """ms cinsinden özet (p50/p95/p99 son örneklerden)"""
+        if not self.count:
+            return {"count": 0}
+        samples = sorted(self.recent)
+
+        def pct(p):
+            return round(samples[min(len(samples) - 1, int(len(samples) * p))] * 1000, 2)
+
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count * 1000, 2),
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+            "p99_ms": pct(0.99),
+            "max_ms": round(self.max * 1000, 2)
+        }
+
+    def prometheus(self, name, labels):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(BUCKETS, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {self.count}')
+        lines.append(f'{name}_sum{{{labels}}} {self.total:.6f}')
+        lines.append(f'{name}_count{{{labels}}} {self.count}')
+        return lines
+
+
+class MetricsRegistry:
+    """Thread-safe action ve aşama metrikleri"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.actions = {}   # action -> {"latency": Histogram, "errors": int, "timeouts": int}
+        self.phases = {}    # aşama -> Histogram
+
+    def _action(self, action):
+        entry = self.actions.get(action)
+        if entry is None:
+            entry = self.actions[action] = {"latency": Histogram(), "errors": 0, "timeouts": 0}
+        return entry
+
+    def record_action(self, action, seconds, status=None):
+        with self._lock:
+            entry = self._action(action)
+            entry["latency"].observe(seconds)
+            if status in ERROR_STATUSES:
+                entry["errors"] += 1
+
+    def record_timeout(self, action):
+        """Deadline aşımı (handler hâlâ çalışıyor olabilir)"""
+        with self._lock:
+            self._action(action)["timeouts"] += 1
+
+    def record_phase(self, phase, seconds):
+        with self._lock:
+            histogram = self.phases.get(phase)
+            if histogram is None:
+                histogram = self.phases[phase] = Histogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timed(self, phase):
+        """with metrics.timed("screenshot.encode"): ..."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_phase(phase, time.perf_counter() - start)
+
+    def reset(self):
+        with self._lock:
+            self.actions.clear()
+            self.phases.clear()
+            self.started = time.time()
+
+    def snapshot(self):
+        with self._lock:
+            actions = {}
+            for action, entry in sorted(self.actions.items()):
+                summary = entry["latency"].summary()
+                summary["errors"] = entry["errors"]
+                summary["timeouts"] = entry["timeouts"]
+                actions[action] = summary
+            phases = {phase: h.summary() for phase, h in sorted(self.phases.items())}
+        return {
+            "uptime_s": round(time.time() - self.started, 1),
+            "actions": actions,
+            "phases": phases
+        }
+
+    def prometheus_text(self):
+        """Prometheus text exposition formatı"""
+        lines = [
+            "# HELP bridge_action_errors_total Commands that ended with error, timeout or cancel.",
+            "# TYPE bridge_action_errors_total counter",
+        ]
+        with self._lock:
+            actions = sorted(self.actions.items())
+            phases = sorted(self.phases.items())
+            for action, entry in actions:
+                lines.append(f'bridge_action_errors_total{{action="{action}"}} {entry["errors"]}')
+            lines += [
+                "# HELP bridge_action_timeouts_total Commands that exceeded deadline_ms.",
+                "# TYPE bridge_action_timeouts_total counter",
+            ]
+            for action, entry in actions:
+                lines.append(f'bridge_action_timeouts_total{{action="{action}"}} {entry["timeouts"]}')
+            lines += [
+                "# HELP bridge_action_duration_seconds Handler latency per action.",
+                "# TYPE bridge_action_duration_seconds histogram",
+            ]
+            for action, entry in actions:
+                lines += entry["latency"].prometheus("bridge_action_duration_seconds", f'action="{action}"')
+            lines += [
+                "# HELP bridge_phase_duration_seconds Latency of internal phases.",
+                "# TYPE bridge_phase_duration_seconds histogram",
+            ]
+            for phase, histogram in phases:
+                lines += histogram.prometheus("bridge_phase_duration_seconds", f'phase="{phase}"')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        tmp = f"{path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp, path)
+
+
+# Global metrics instance
+metrics = MetricsRegistry()
+
+
+def start_prometheus_writer(path, interval=15.0):
+    """Prometheus dosyasını arka planda periyodik olarak yeniden yaz"""
+    def loop():
+        while True:
+            try:
+                metrics.write_prometheus(path)
+            except OSError as e:
+                print(f"  ✗ Metrics write failed: {e}")
+            time.sleep(interval)
+
+    thread = threading.Thread(target=loop, name="metrics-writer", daemon=True)
+    thread.start()
+    return thread
+
+
+# ============== ACTION HANDLERS ==============
+
+def metrics_action(params):
+    """Toplanan metrikleri döndür"""
+    result = {"status": "success", "action": "metrics"}
+    result.update(metrics.snapshot())
+    if params.get("reset", False):
+        metrics.reset()
+        result["reset"] = True
+    return result
+
+
+# Dışa açılan action'lar
+ACTIONS = {
+    "metrics": metrics_action,
+}
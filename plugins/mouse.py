@@ -5,17 +5,20 @@ Mouse Plugin
 import time
 import pyautogui
 from .shared import screenshot_mgr
+from .vision import observable
 
 
+@observable
 def click(params):
     """Mouse tıklama"""
     x, y = params.get("x", 0), params.get("y", 0)
     button = params.get("button", "left")
     clicks = params.get("clicks", 1)
-    use_screenshot_coords = params.get("screenshot_coords", False)
+    screenshot_id = params.get("screenshot_id")
+    use_screenshot_coords = params.get("screenshot_coords", False) or bool(screenshot_id)
     
     if use_screenshot_coords:
-        real_x, real_y = screenshot_mgr.convert_coords(x, y)
+        real_x, real_y = screenshot_mgr.convert_coords(x, y, screenshot_id)
     else:
         real_x, real_y = x, y
     
@@ -27,6 +30,7 @@ def click(params):
         "input_coords": [x, y],
         "real_coords": [real_x, real_y],
         "screenshot_coords": use_screenshot_coords,
+        "screenshot_id": screenshot_id,
         "scale_ratio": screenshot_mgr.scale_ratio
     }
 
@@ -35,10 +39,11 @@ def move(params):
     """Mouse taşı"""
     x, y = params.get("x", 0), params.get("y", 0)
     duration = params.get("duration", 0.2)
-    use_screenshot_coords = params.get("screenshot_coords", False)
+    screenshot_id = params.get("screenshot_id")
+    use_screenshot_coords = params.get("screenshot_coords", False) or bool(screenshot_id)
     
     if use_screenshot_coords:
-        real_x, real_y = screenshot_mgr.convert_coords(x, y)
+        real_x, real_y = screenshot_mgr.convert_coords(x, y, screenshot_id)
     else:
         real_x, real_y = x, y
     
@@ -53,14 +58,16 @@ def move(params):
     }
 
 
+@observable
 def scroll(params):
     """Mouse scroll"""
     amount = params.get("amount", -3)
     x, y = params.get("x"), params.get("y")
-    use_screenshot_coords = params.get("screenshot_coords", False)
+    screenshot_id = params.get("screenshot_id")
+    use_screenshot_coords = params.get("screenshot_coords", False) or bool(screenshot_id)
     
     if use_screenshot_coords and x is not None and y is not None:
-        x, y = screenshot_mgr.convert_coords(x, y)
+        x, y = screenshot_mgr.convert_coords(x, y, screenshot_id)
     
     pyautogui.scroll(amount, x=x, y=y)
     return {"status": "success", "action": "scroll", "amount": amount}
@@ -72,6 +79,7 @@ def mouse_position(params):
     return {"status": "success", "x": x, "y": y}
 
 
+@observable
 def drag(params):
     """Sürükle bırak"""
     start_x = params.get("start_x", 0)
@@ -80,11 +88,12 @@ def drag(params):
     end_y = params.get("end_y", 0)
     duration = params.get("duration", 0.5)
     button = params.get("button", "left")
-    use_screenshot_coords = params.get("screenshot_coords", False)
+    screenshot_id = params.get("screenshot_id")
+    use_screenshot_coords = params.get("screenshot_coords", False) or bool(screenshot_id)
     
     if use_screenshot_coords:
-        real_start_x, real_start_y = screenshot_mgr.convert_coords(start_x, start_y)
-        real_end_x, real_end_y = screenshot_mgr.convert_coords(end_x, end_y)
+        real_start_x, real_start_y = screenshot_mgr.convert_coords(start_x, start_y, screenshot_id)
+        real_end_x, real_end_y = screenshot_mgr.convert_coords(end_x, end_y, screenshot_id)
     else:
         real_start_x, real_start_y = start_x, start_y
         real_end_x, real_end_y = end_x, end_y
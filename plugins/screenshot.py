@@ -2,28 +2,165 @@
 Screenshot Plugin
 """
 
-from .shared import screenshot_mgr
+from .shared import screenshot_mgr, capture_ring, DIFF_THRESHOLD, DIFF_MAX_REGIONS, RING_SIZE, MAX_WIDTH, TILE_SIZE
+from .imaging import DIFF_BLOCK, DIFF_TOLERANCE
+from .context import time_left
+from . import encoder, delivery
+
+RING_WAIT_TIMEOUT = 2.0  # newer_than için varsayılan bekleme (saniye)
+
+
+def _output_options(params):
+    """Kodlama + teslim seçenekleri (format, quality, max_kb, grayscale, delivery, persist)"""
+    return {**encoder.options_from_params(params), **delivery.options_from_params(params)}
 
 
 def screenshot(params):
-    """Screenshot al"""
+    """Screenshot al
+    
+    Çıktı seçenekleri (tüm modlar): format (auto/jpeg/webp/png),
+    quality (low/medium/high veya sayı), max_kb, grayscale,
+    resize (speed/balanced/quality),
+    delivery (file/inline/shm; HTTP'de varsayılan inline), persist
+    
+    Arka plan yakalama (capture_ring) açıksa full mod en taze ring karesini
+    döner; newer_than (unix zamanı) ile o andan sonraki ilk kare beklenir,
+    live: true ile yine anlık yakalanır.
+    
+    mode "monitor": tek monitör - monitor: sıra no (1..), "primary" veya
+    "active" (fare imlecinin olduğu, varsayılan).
+    """
     mode = params.get("mode", "full")
+    try:
+        encoding = _output_options(params)
+        resize = params.get("resize")
+        
+        if mode == "full" and not params.get("live") and (capture_ring.running or "newer_than" in params):
+            return _from_ring(params, encoding)
+        
+        if mode == "reference":
+            return screenshot_mgr.take_reference(encoding, resize)
+        elif mode == "window":
+            return screenshot_mgr.take_active_window(encoding, resize)
+        elif mode == "monitor":
+            return screenshot_mgr.take_monitor(params.get("monitor", "active"), encoding, resize)
+        elif mode == "region":
+            x = params.get("x", 0)
+            y = params.get("y", 0)
+            w = params.get("w", 800)
+            h = params.get("h", 600)
+            return screenshot_mgr.take_region(x, y, w, h, encoding, resize)
+        elif mode == "pyramid":
+            return screenshot_mgr.take_pyramid(encoding, int(params.get("tile_size", TILE_SIZE)))
+        elif mode == "diff":
+            return screenshot_mgr.take_diff(
+                threshold=float(params.get("threshold", DIFF_THRESHOLD)),
+                block=int(params.get("block", DIFF_BLOCK)),
+                tolerance=int(params.get("tolerance", DIFF_TOLERANCE)),
+                max_regions=int(params.get("max_regions", DIFF_MAX_REGIONS)),
+                encoding=encoding,
+                resize=resize
+            )
+        else:
+            return screenshot_mgr.take_full(encoding, resize)
+    except (RuntimeError, ValueError) as e:
+        return {"status": "error", "message": str(e)}
+
+
+def _from_ring(params, encoding):
+    """Ring buffer'dan kare seç: en taze veya newer_than'dan sonraki ilk kare"""
+    if not capture_ring.running:
+        return {"status": "error", "message": "newer_than needs the capture ring (capture_ring enable)"}
     
-    if mode == "reference":
-        return screenshot_mgr.take_reference()
-    elif mode == "window":
-        return screenshot_mgr.take_active_window()
-    elif mode == "region":
-        x = params.get("x", 0)
-        y = params.get("y", 0)
-        w = params.get("w", 800)
-        h = params.get("h", 600)
-        return screenshot_mgr.take_region(x, y, w, h)
+    if "newer_than" in params:
+        timeout = time_left(float(params.get("timeout", RING_WAIT_TIMEOUT)))
+        frame = capture_ring.wait_newer(float(params["newer_than"]), timeout)
+        if frame is None:
+            return {
+                "status": "timeout",
+                "message": f"No frame newer than {params['newer_than']} within {timeout:.2f}s",
+                "ring": capture_ring.status()
+            }
     else:
-        return screenshot_mgr.take_full()
+        frame = capture_ring.latest()
+        if frame is None:
+            # Ring yeni başladı - ilk kareyi bekle
+            frame = capture_ring.wait_newer(0, time_left(RING_WAIT_TIMEOUT))
+        if frame is None:
+            return {"status": "error", "message": "Capture ring has no frames", "ring": capture_ring.status()}
+    return screenshot_mgr.take_from_ring(frame, encoding)
+
+
+def capture_ring_action(params):
+    """Arka plan yakalamayı aç/kapat veya durumunu al
+    
+    {"enable": true, "fps": 5, "size": 8, "resize": "speed"} | {"enable": false} | {}
+    """
+    if "enable" in params:
+        if params["enable"]:
+            try:
+                capture_ring.start(
+                    fps=float(params.get("fps", 5)),
+                    size=int(params.get("size", RING_SIZE)),
+                    resize=params.get("resize")
+                )
+            except ValueError as e:
+                return {"status": "error", "message": str(e)}
+        else:
+            capture_ring.stop()
+    
+    result = {"status": "success", "action": "capture_ring"}
+    result.update(capture_ring.status())
+    return result
+
+
+def crop(params):
+    """Önbellekteki bir screenshot'tan yüksek çözünürlüklü kesit (yeniden yakalamadan)
+    
+    {"screenshot_id": "s12", "x": 100, "y": 50, "w": 200, "h": 120, "max_width": 1000}
+    Koordinatlar kaynak screenshot'ın görüntü koordinatlarıdır (diff karelerinde ekran).
+    """
+    try:
+        return screenshot_mgr.crop(
+            params.get("screenshot_id"),
+            float(params.get("x", 0)), float(params.get("y", 0)),
+            float(params["w"]), float(params["h"]),
+            max_width=int(params.get("max_width", MAX_WIDTH)),
+            encoding=_output_options(params),
+            resize=params.get("resize")
+        )
+    except KeyError as e:
+        return {"status": "error", "message": f"Missing parameter: {e.args[0]}"}
+    except ValueError as e:
+        return {"status": "error", "message": str(e)}
+
+
+def screenshot_tile(params):
+    """Piramit screenshot'ından karo (aynı yakalamadan, daha yüksek zoom)
+    
+    {"screenshot_id": "s12", "level": 2, "col": 3, "row": 1}
+    veya genel bakış koordinatıyla: {"screenshot_id": "s12", "level": 2, "x": 640, "y": 300}
+    """
+    try:
+        def optional_int(name):
+            return int(params[name]) if params.get(name) is not None else None
+        
+        return screenshot_mgr.tile(
+            params.get("screenshot_id"),
+            int(params.get("level", 1)),
+            col=optional_int("col"), row=optional_int("row"),
+            x=params.get("x"), y=params.get("y"),
+            tile_size=int(params.get("tile_size", TILE_SIZE)),
+            encoding=_output_options(params)
+        )
+    except ValueError as e:
+        return {"status": "error", "message": str(e)}
 
 
 # Dışa açılan action'lar
 ACTIONS = {
     "screenshot": screenshot,
+    "capture_ring": capture_ring_action,
+    "crop": crop,
+    "screenshot_tile": screenshot_tile,
 }
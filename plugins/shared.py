@@ -5,21 +5,550 @@ Shared state ve yardımcı fonksiyonlar
 import os
 import sys
 import subprocess
+import threading
 import time
+from collections import deque, OrderedDict
 
 import pyautogui
 from PIL import Image
 
+from .metrics import metrics
+from . import imaging
+from . import encoder
+from . import delivery
+from .context import check_cancelled
+
 # ============== AYARLAR ==============
 BRIDGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 SCREENSHOT_DIR = os.path.join(BRIDGE_DIR, "screenshots")
 MAX_WIDTH = 1000
-JPEG_QUALITY = 65
+DIFF_THRESHOLD = 0.25   # diff modu: değişen alan oranı bunu aşarsa tam kare gönder
+DIFF_MAX_REGIONS = 8
+DIFF_PADDING = 8        # Değişen kutuların etrafına eklenen bağlam (piksel)
+RING_SIZE = 8           # Arka plan yakalama: saklanan kare sayısı (~1.7 MB/kare @1000px)
+FRAME_CACHE_SIZE = 8    # screenshot_id ile erişilebilen ham kare sayısı
+FRAME_CACHE_MB = 160    # ... ve toplam bellek sınırı (4K ham kare ~25 MB)
+AUX_FRAME_KINDS = ("find", "settle")  # Arama / ekran izleme kareleri: ayrı bütçe
+AUX_FRAME_CACHE_SIZE = 4
+AUX_FRAME_CACHE_MB = 100
+TILE_SIZE = 512         # Piramit karo boyutu (seviye pikseli)
+MONITOR_CACHE_S = 5.0   # Monitör listesi bu kadar süre önbellekte (hotplug için yenilenir)
+# Capture backend: "auto" | "mss" | "imagegrab" | "pyautogui"
+CAPTURE_BACKEND = os.environ.get("BRIDGE_CAPTURE_BACKEND", "auto")
 
 # PyAutoGUI güvenlik
 pyautogui.FAILSAFE = True
 pyautogui.PAUSE = 0.1
 
+# ============== CAPTURE BACKENDS ==============
+class CaptureBackend:
+    """Ekran yakalama arayüzü: grab(region) → RGB PIL Image
+
+    region (x, y, w, h) verilirse sadece o dikdörtgen okunur.
+    """
+
+    name = "base"
+
+    def grab(self, region=None):
+        raise NotImplementedError
+
+    def probe(self):
+        """Backend bu ortamda çalışıyor mu (1x1 piksel oku)"""
+        self.grab((0, 0, 1, 1))
+
+    def monitors(self):
+        """Backend'in bildiği monitörler [(x, y, w, h)]; bilmiyorsa None"""
+        return None
+
+
+class MssBackend(CaptureBackend):
+    """python-mss: X11'de XGetImage/XShm, Windows'ta BitBlt, macOS'ta CoreGraphics
+
+    mss nesnesi thread'ler arasında paylaşılamaz - thread başına bir tane.
+    """
+
+    name = "mss"
+
+    def __init__(self):
+        import mss
+        self._mss = mss
+        self._local = threading.local()
+
+    def _sct(self):
+        sct = getattr(self._local, "sct", None)
+        if sct is None:
+            sct = self._local.sct = self._mss.mss()
+        return sct
+
+    def grab(self, region=None):
+        sct = self._sct()
+        if region:
+            x, y, w, h = region
+            monitor = {"left": int(x), "top": int(y), "width": int(w), "height": int(h)}
+        else:
+            monitor = sct.monitors[0]  # Tüm sanal masaüstü (pyautogui ile aynı)
+        shot = sct.grab(monitor)
+        return Image.frombytes("RGB", shot.size, shot.bgra, "raw", "BGRX")
+
+    def monitors(self):
+        # monitors[0] sanal masaüstü, 1.. fiziksel monitörler
+        return [(m["left"], m["top"], m["width"], m["height"]) for m in self._sct().monitors[1:]]
+
+
+class ImageGrabBackend(CaptureBackend):
+    """Pillow ImageGrab: Linux'ta süreç içi XCB, Windows/macOS'ta native API
+
+    pyautogui (pyscreeze) Linux'ta bölge istense bile tüm ekranı alıp kırpar;
+    burada bbox doğrudan X sunucusuna gider.
+    """
+
+    name = "imagegrab"
+
+    def __init__(self):
+        from PIL import ImageGrab
+        if sys.platform.startswith("linux"):
+            from PIL import features
+            if not features.check("xcb") or not os.environ.get("DISPLAY"):
+                raise RuntimeError("Pillow XCB support or DISPLAY missing")
+        self._grab = ImageGrab.grab
+
+    def grab(self, region=None):
+        if region:
+            x, y, w, h = region
+            img = self._grab(bbox=(x, y, x + w, y + h), all_screens=True)
+        else:
+            img = self._grab(all_screens=True)
+        return img if img.mode == "RGB" else img.convert("RGB")
+
+
+class PyAutoGUIBackend(CaptureBackend):
+    """Yedek: pyautogui.screenshot() (her platformda var, en yavaşı)"""
+
+    name = "pyautogui"
+
+    def grab(self, region=None):
+        if region:
+            return pyautogui.screenshot(region=tuple(int(v) for v in region))
+        return pyautogui.screenshot()
+
+
+CAPTURE_BACKENDS = {
+    "mss": MssBackend,
+    "imagegrab": ImageGrabBackend,
+    "pyautogui": PyAutoGUIBackend,
+}
+
+_capture_backend = None
+_capture_lock = threading.Lock()
+
+
+def create_capture_backend(name="auto"):
+    """İstenen backend'i kur; "auto" ise çalışan ilk hızlı backend'i seç"""
+    if name != "auto":
+        return CAPTURE_BACKENDS[name]()
+    for candidate in ("mss", "imagegrab"):
+        try:
+            backend = CAPTURE_BACKENDS[candidate]()
+            backend.probe()
+            return backend
+        except Exception:
+            continue
+    return PyAutoGUIBackend()
+
+
+def get_capture_backend():
+    """Aktif capture backend'i (ilk kullanımda seçilir)"""
+    global _capture_backend
+    if _capture_backend is None:
+        with _capture_lock:
+            if _capture_backend is None:
+                _capture_backend = create_capture_backend(CAPTURE_BACKEND)
+    return _capture_backend
+
+
+def set_capture_backend(name):
+    """Backend'i değiştir (benchmark / yapılandırma için)"""
+    global _capture_backend
+    with _capture_lock:
+        _capture_backend = create_capture_backend(name)
+    return _capture_backend
+
+
+def grab_screen(region=None, phase="screenshot.capture"):
+    """Aktif backend ile yakala (region = (x, y, w, h) veya None)"""
+    backend = get_capture_backend()
+    with metrics.timed(phase):
+        return backend.grab(region)
+
+
+# ============== MONİTÖRLER ==============
+class Monitor:
+    """Tek fiziksel monitör: sanal masaüstündeki dikdörtgeni (mantıksal koordinat)"""
+    
+    __slots__ = ("index", "name", "x", "y", "width", "height", "primary")
+    
+    def __init__(self, index, x, y, width, height, name="", primary=False):
+        self.index = index      # 1'den başlar (mss ile aynı numaralama)
+        self.name = name
+        self.x, self.y = x, y
+        self.width, self.height = width, height
+        self.primary = primary
+    
+    @property
+    def region(self):
+        return (self.x, self.y, self.width, self.height)
+    
+    def contains(self, x, y):
+        return self.x <= x < self.x + self.width and self.y <= y < self.y + self.height
+    
+    def info(self):
+        return {
+            "index": self.index,
+            "name": self.name,
+            "x": self.x,
+            "y": self.y,
+            "width": self.width,
+            "height": self.height,
+            "primary": self.primary
+        }
+
+
+def _xrandr_monitors():
+    """Linux: `xrandr --listmonitors` → [(x, y, w, h, ad, birincil mi)]
+    
+    Satır örneği: " 0: +*DP-1 1920/527x1080/296+0+0  DP-1"
+    """
+    output = subprocess.run(["xrandr", "--listmonitors"], capture_output=True, text=True,
+                            timeout=2).stdout
+    found = []
+    for line in output.splitlines()[1:]:
+        parts = line.split()
+        if len(parts) < 3:
+            continue
+        geometry = parts[2]
+        size, x, y = geometry.split("+")
+        w, h = (int(v.split("/")[0]) for v in size.split("x"))
+        found.append((int(x), int(y), w, h, parts[-1], "*" in parts[1]))
+    return found
+
+
+def _detect_monitors():
+    """Monitörleri bul: capture backend (mss) → xrandr; bulunamazsa []"""
+    try:
+        regions = get_capture_backend().monitors()
+    except Exception:
+        regions = None
+    if regions:
+        return [Monitor(i + 1, *region, primary=(region[0], region[1]) == (0, 0))
+                for i, region in enumerate(regions)]
+    if sys.platform.startswith("linux"):
+        try:
+            found = _xrandr_monitors()
+        except (OSError, ValueError, subprocess.SubprocessError):
+            found = []
+        # Soldan sağa, yukarıdan aşağı (mss sırası)
+        found.sort(key=lambda m: (m[0], m[1]))
+        return [Monitor(i + 1, x, y, w, h, name=name, primary=primary)
+                for i, (x, y, w, h, name, primary) in enumerate(found)]
+    return []
+
+
+_monitors = None
+_monitors_at = 0.0
+_monitors_lock = threading.Lock()
+
+
+def list_monitors(refresh=False):
+    """Bağlı monitörler (MONITOR_CACHE_S süreyle önbellekli)
+    
+    Monitör bilgisi alınamazsa tek ekran: pyautogui.size() (her çağrıda güncel).
+    """
+    global _monitors, _monitors_at
+    with _monitors_lock:
+        if refresh or _monitors is None or time.monotonic() - _monitors_at > MONITOR_CACHE_S:
+            _monitors = _detect_monitors()
+            _monitors_at = time.monotonic()
+        monitors = _monitors
+    if monitors:
+        return monitors
+    w, h = pyautogui.size()
+    return [Monitor(1, 0, 0, w, h, primary=True)]
+
+
+def get_monitor(spec="active"):
+    """Monitör seç: sıra numarası (1..), "primary" veya "active" (fare imlecinin olduğu)"""
+    monitors = list_monitors()
+    if spec in (None, "", "active"):
+        x, y = pyautogui.position()
+        for monitor in monitors:
+            if monitor.contains(x, y):
+                return monitor
+        spec = "primary"
+    if spec == "primary":
+        return next((m for m in monitors if m.primary), monitors[0])
+    index = int(spec)
+    if not 1 <= index <= len(monitors):
+        raise ValueError(f"Unknown monitor: {spec} ({len(monitors)} connected)")
+    return monitors[index - 1]
+
+
+def screen_bounds():
+    """Tüm monitörleri kapsayan sanal masaüstü (x, y, w, h) - tam ekran karelerinin alanı"""
+    monitors = list_monitors()
+    if len(monitors) == 1:
+        return monitors[0].region
+    x0 = min(m.x for m in monitors)
+    y0 = min(m.y for m in monitors)
+    x1 = max(m.x + m.width for m in monitors)
+    y1 = max(m.y + m.height for m in monitors)
+    return (x0, y0, x1 - x0, y1 - y0)
+
+
+# ============== ARKA PLAN YAKALAMA ==============
+class Frame:
+    """Ring buffer'daki kare: küçültülmüş görüntü + yakalama zamanı"""
+    
+    __slots__ = ("seq", "timestamp", "image", "pixel_size", "capture_ms")
+    
+    def __init__(self, seq, timestamp, image, pixel_size, capture_ms):
+        self.seq = seq
+        self.timestamp = timestamp      # Yakalamanın başladığı an (time.time())
+        self.image = image              # MAX_WIDTH'e küçültülmüş kopya
+        self.pixel_size = pixel_size    # Ham karenin boyutu
+        self.capture_ms = capture_ms
+    
+    def info(self):
+        return {
+            "seq": self.seq,
+            "timestamp": round(self.timestamp, 3),
+            "age_ms": round((time.time() - self.timestamp) * 1000, 1),
+            "capture_ms": self.capture_ms
+        }
+
+
+class CaptureRing:
+    """Sabit hızda ekran yakalayan thread + sınırlı ring buffer
+    
+    Kareler yakalama thread'inde küçültülür; screenshot isteği en taze
+    kareyi beklemeden alır. Bellek kullanımı size x küçük kare ile sınırlı.
+    """
+    
+    def __init__(self):
+        self.frames = deque(maxlen=RING_SIZE)
+        self.fps = 0.0
+        self.resize = None
+        self.seq = 0
+        self.errors = 0
+        self.last_error = None
+        self._condition = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = None
+    
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+    
+    def start(self, fps=5.0, size=RING_SIZE, resize=None):
+        """Yakalama thread'ini başlat (çalışıyorsa ayarları güncelleyip yeniden başlat)"""
+        if fps <= 0:
+            raise ValueError("fps must be positive")
+        self.stop()
+        with self._condition:
+            self.frames = deque(self.frames, maxlen=max(1, int(size)))
+        self.fps = float(fps)
+        self.resize = resize
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, args=(self._stop,), name="capture-ring", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join(timeout=2.0)
+            self._thread = None
+    
+    def _loop(self, stop):
+        interval = 1.0 / self.fps
+        next_time = time.monotonic()
+        while not stop.is_set():
+            timestamp = time.time()
+            start = time.perf_counter()
+            try:
+                img = grab_screen(phase="ring.capture")
+                capture_ms = round((time.perf_counter() - start) * 1000, 2)
+                small = img
+                if img.width > MAX_WIDTH:
+                    with metrics.timed("ring.resize"):
+                        small = imaging.resize(img, MAX_WIDTH, int(img.height * MAX_WIDTH / img.width), self.resize)
+            except Exception as e:
+                self.errors += 1
+                self.last_error = str(e)
+                stop.wait(1.0)
+                continue
+            
+            with self._condition:
+                self.seq += 1
+                self.frames.append(Frame(self.seq, timestamp, small, img.size, capture_ms))
+                self._condition.notify_all()
+            
+            next_time += interval
+            delay = next_time - time.monotonic()
+            if delay < 0:
+                next_time = time.monotonic()  # Geride kaldıysak yetişmeye çalışma
+                delay = 0
+            stop.wait(delay)
+    
+    def latest(self):
+        with self._condition:
+            return self.frames[-1] if self.frames else None
+    
+    def wait_newer(self, timestamp, timeout):
+        """timestamp'ten sonra yakalanmaya başlanan ilk kare (yoksa timeout'ta None)"""
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while True:
+                for frame in self.frames:
+                    if frame.timestamp > timestamp:
+                        return frame
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self.running:
+                    return None
+                # Kısa dilimlerle bekle - komut iptal/deadline kontrolü için
+                self._condition.wait(min(remaining, 0.05))
+                check_cancelled()
+    
+    def status(self):
+        with self._condition:
+            latest = self.frames[-1] if self.frames else None
+            return {
+                "running": self.running,
+                "fps": self.fps,
+                "size": self.frames.maxlen,
+                "frames": len(self.frames),
+                "captured": self.seq,
+                "errors": self.errors,
+                "last_error": self.last_error,
+                "latest": latest.info() if latest else None
+            }
+
+
+# Global capture ring (başlatılana kadar boş)
+capture_ring = CaptureRing()
+
+
+# ============== KARE ÖNBELLEĞİ (screenshot_id) ==============
+class CachedFrame:
+    """Gönderilen bir screenshot'ın ham karesi + koordinat dönüşümü
+    
+    Ekran koordinatı = origin + görüntü koordinatı * scale
+    (görüntü = agent'a giden küçültülmüş resim). image en yüksek
+    çözünürlüklü kopyadır; crop/zoom buradan yapılır. offset: ham karenin
+    sol üst köşesinin görüntü koordinatı (diff karelerinde görüntü
+    koordinatı = ekran koordinatı, köşe sanal masaüstü başlangıcıdır).
+    """
+    
+    __slots__ = ("id", "image", "origin", "scale", "size", "kind", "offset", "timestamp", "halvings")
+    
+    def __init__(self, frame_id, image, origin, scale, size, kind, offset=(0, 0)):
+        self.id = frame_id
+        self.image = image
+        self.origin = origin
+        self.scale = scale
+        self.size = size
+        self.kind = kind
+        self.offset = offset
+        self.timestamp = time.time()
+        self.halvings = [image]   # Piramit: [ham, ham/2, ham/4, ...] (ilk istekte üretilir)
+    
+    def halved(self, count):
+        """Ham karenin count kez yarıya indirilmiş hali (Image.reduce(2) zinciri, önbellekli)"""
+        while len(self.halvings) <= count:
+            self.halvings.append(self.halvings[-1].reduce(2))
+        return self.halvings[count]
+    
+    @property
+    def nbytes(self):
+        return sum(img.width * img.height * len(img.getbands()) for img in self.halvings)
+    
+    def to_screen(self, x, y):
+        """Görüntü koordinatı → gerçek ekran koordinatı"""
+        return (int(round(self.origin[0] + x * self.scale[0])),
+                int(round(self.origin[1] + y * self.scale[1])))
+    
+    def to_pixels(self, x, y):
+        """Görüntü koordinatı → ham kare pikseli"""
+        return ((x - self.offset[0]) * self.image.width / self.size[0],
+                (y - self.offset[1]) * self.image.height / self.size[1])
+    
+    def pixels_to_screen(self, px, py):
+        """Ham kare pikseli → gerçek ekran koordinatı (float)"""
+        return (self.origin[0] + (px * self.size[0] / self.image.width + self.offset[0]) * self.scale[0],
+                self.origin[1] + (py * self.size[1] / self.image.height + self.offset[1]) * self.scale[1])
+    
+    def screen_to_pixels(self, x, y):
+        """Gerçek ekran koordinatı → ham kare pikseli"""
+        return self.to_pixels((x - self.origin[0]) / self.scale[0], (y - self.origin[1]) / self.scale[1])
+    
+    def transform(self):
+        return {"origin": list(self.origin), "scale": [round(v, 4) for v in self.scale]}
+
+
+class FrameStore:
+    """screenshot_id → CachedFrame LRU (adet ve bayt sınırlı)
+    
+    find_image/find_text ve ekran izleme (wait_screen_*, observe) kareleri
+    kendi bütçeleriyle ayrı tutulur: sık aramalar agent'ın crop/click için
+    kullandığı screenshot id'lerini LRU'dan düşürmez.
+    """
+    
+    def __init__(self, max_frames=FRAME_CACHE_SIZE, max_bytes=FRAME_CACHE_MB * 1024 * 1024,
+                 aux_frames=AUX_FRAME_CACHE_SIZE, aux_bytes=AUX_FRAME_CACHE_MB * 1024 * 1024):
+        self.max_frames = max_frames
+        self.max_bytes = max_bytes
+        self.aux_frames = aux_frames
+        self.aux_bytes = aux_bytes
+        self._frames = OrderedDict()
+        self._lock = threading.Lock()
+        self._seq = 0
+    
+    def add(self, image, origin, scale, size, kind, offset=(0, 0)):
+        with self._lock:
+            self._seq += 1
+            frame = CachedFrame(f"s{self._seq}", image, tuple(origin), tuple(scale), tuple(size), kind,
+                                tuple(offset))
+            self._frames[frame.id] = frame
+            self._evict(kind in AUX_FRAME_KINDS)
+            return frame
+    
+    def _evict(self, aux):
+        """Aynı havuzdaki en eski kareleri sınır altına inene kadar at (kilit tutulurken)"""
+        max_frames, max_bytes = (self.aux_frames, self.aux_bytes) if aux else (self.max_frames, self.max_bytes)
+        pool = [f for f in self._frames.values() if (f.kind in AUX_FRAME_KINDS) == aux]
+        total = sum(f.nbytes for f in pool)
+        while len(pool) > 1 and (len(pool) > max_frames or total > max_bytes):
+            evicted = pool.pop(0)
+            del self._frames[evicted.id]
+            total -= evicted.nbytes
+    
+    def get(self, frame_id):
+        with self._lock:
+            frame = self._frames.get(frame_id)
+            if frame is not None:
+                self._frames.move_to_end(frame_id)
+            return frame
+    
+    def require(self, frame_id):
+        """Kareyi döndür; yoksa (hiç olmadı / LRU'dan düştü) ValueError"""
+        frame = self.get(frame_id)
+        if frame is None:
+            raise ValueError(f"Unknown or expired screenshot_id: {frame_id} (take a new screenshot)")
+        return frame
+    
+    def ids(self):
+        with self._lock:
+            return list(self._frames)
+
+
 # ============== SCREENSHOT MANAGER ==============
 class ScreenshotManager:
     """Akıllı screenshot yönetimi + koordinat dönüşümü"""
@@ -39,70 +568,445 @@ class ScreenshotManager:
         self.screen_width = 0
         self.screen_height = 0
         
-    def _resize_and_save(self, img, filepath):
-        """Resmi küçült ve JPEG olarak kaydet"""
-        original_w, original_h = img.width, img.height
-        screen_w, screen_h = pyautogui.size()
+        # diff modu için son tam ekran karesi
+        self.previous_frame = None
+        # dosya yolu → son yazılan karenin key/hash/sonucu (değişmeyen ekranı yeniden kodlamamak için)
+        self.last_saved = {}
+        # screenshot_id → ham kare + dönüşüm (crop / id ile tıklama)
+        self.frames = FrameStore()
+        self.last_full_id = None
         
-        if img.width > MAX_WIDTH:
-            self.scale_ratio = screen_w / MAX_WIDTH
-            ratio = MAX_WIDTH / img.width
-            new_height = int(img.height * ratio)
-            img = img.resize((MAX_WIDTH, new_height), Image.LANCZOS)
-        else:
-            self.scale_ratio = 1.0
+    def _transform_state(self):
+        return {
+            "scale_ratio": self.scale_ratio,
+            "original_width": self.original_width,
+            "original_height": self.original_height,
+            "resized_width": self.resized_width,
+            "resized_height": self.resized_height,
+            "screen_width": self.screen_width,
+            "screen_height": self.screen_height,
+        }
+    
+    def _restore_transform_state(self, state):
+        """_transform_state() ile alınan koordinat dönüşümünü geri yükle"""
+        self.scale_ratio = state["scale_ratio"]
+        self.original_width = state["original_width"]
+        self.original_height = state["original_height"]
+        self.resized_width = state["resized_width"]
+        self.resized_height = state["resized_height"]
+        self.screen_width = state["screen_width"]
+        self.screen_height = state["screen_height"]
+    
+    def _cached_result(self, filepath, key, digest, raw):
+        """Aynı dosya/bölge için aynı kare zaten yazıldıysa önceki sonucu döndür"""
+        entry = self.last_saved.get(filepath)
+        if not entry or entry["key"] != key or entry["digest"] != digest:
+            return None
+        if "path" in entry["result"] and not os.path.exists(entry["result"]["path"]):
+            return None
+        result = dict(entry["result"])
+        if "shm" in result:
+            # Segment o arada başka kareyle ezilmiş olabilir - kodlanmış byte'ları yeniden koy
+            result["shm"] = delivery.shm_pool.put(entry["encoded"].data)
+        frame = self.frames.get(result["screenshot_id"])
+        if frame is None:
+            # Kare LRU'dan düşmüş - aynı piksellerle yeniden kaydet
+            old = entry["frame"]
+            frame = self.frames.add(raw, old.origin, old.scale, old.size, old.kind, old.offset)
+            entry["frame"] = frame
+            entry["result"]["screenshot_id"] = result["screenshot_id"] = frame.id
+        if entry["state"]:
+            # Koordinat dönüşümünü o karenin değerlerine geri al
+            self._restore_transform_state(entry["state"])
+            self.last_full_id = frame.id
+        result["unchanged"] = True
+        return result
+    
+    def _resize_and_save(self, img, filepath, key=None, encoding=None, resize=None,
+                         pixel_size=None, region=None, kind="full", output=None):
+        """Resmi küçült (resize preset), kodla (encoder) ve kaydet
         
-        self.original_width = original_w
-        self.original_height = original_h
-        self.resized_width = img.width
-        self.resized_height = img.height
-        self.screen_width = screen_w
-        self.screen_height = screen_h
+        key (mod/bölge) verilirse ham kare hash'lenir; aynı key ve
+        seçenekler için ekran değişmediyse resize/encode/yazma atlanır ve
+        önceki dosya döner. filepath'in uzantısı seçilen formata göre değişir.
+        pixel_size: img zaten küçültülmüşse (ring karesi) ham karenin boyutu.
+        region: (x, y, w, h) ekran bölgesi; None ise tam ekran. Sadece tam
+        ekran ve monitör (kind="monitor") kareleri screenshot_id'siz
+        screenshot_coords dönüşümünü günceller.
+        Her kare bir screenshot_id ile önbelleğe alınır.
+        output: gönderilecek, önceden küçültülmüş görüntü (piramit genel bakışı).
+        encoding: encoder seçenekleri + delivery/persist (plugins.delivery).
+        """
+        encoding = encoding or {}
+        if key is not None:
+            key = (key, resize, tuple(sorted(encoding.items())))
+            with metrics.timed("screenshot.hash"):
+                digest = imaging.frame_digest(img)
+            cached = self._cached_result(filepath, key, digest, img)
+            if cached:
+                return cached
+        self.last_saved.pop(filepath, None)  # Dosya bu çağrıda üzerine yazılacak
         
-        if img.mode == 'RGBA':
-            img = img.convert('RGB')
+        raw = img
+        original_w, original_h = pixel_size or img.size
+        screen_x, screen_y, screen_w, screen_h = screen_bounds()
         
-        img.save(filepath, "JPEG", quality=JPEG_QUALITY, optimize=True)
+        if output is not None:
+            img = output
+        elif not pixel_size and img.width > MAX_WIDTH:
+            new_height = int(img.height * MAX_WIDTH / img.width)
+            with metrics.timed("screenshot.resize"):
+                img = imaging.resize(img, MAX_WIDTH, new_height, resize)
         
-        return {
+        # Görüntü koordinatı → ekran koordinatı
+        origin_x, origin_y, extent_w, extent_h = region or (screen_x, screen_y, screen_w, screen_h)
+        frame = self.frames.add(raw, (origin_x, origin_y),
+                                (extent_w / img.width, extent_h / img.height), img.size, kind)
+        
+        state = None
+        if region is None or kind == "monitor":
+            # Tam ekran veya tek monitör: screenshot_id'siz screenshot_coords artık bu kareye göre
+            self.scale_ratio = extent_w / img.width
+            self.original_width = original_w
+            self.original_height = original_h
+            self.resized_width = img.width
+            self.resized_height = img.height
+            self.screen_width = screen_w
+            self.screen_height = screen_h
+            self.last_full_id = frame.id
+            state = self._transform_state()
+        
+        cache_key = (digest, img.size, resize) if key is not None else None
+        encoded, fields = self._encode_and_write(img, filepath, encoding, cache_key)
+        
+        result = {
             "width": img.width,
             "height": img.height,
-            "path": filepath,
-            "size_kb": round(os.path.getsize(filepath) / 1024, 1),
-            "scale_ratio": round(self.scale_ratio, 3),
+            **fields,
+            "size_kb": round(encoded.size / 1024, 1),
+            "encode": encoded.info(),
+            "screenshot_id": frame.id,
+            "transform": frame.transform(),
+            "scale_ratio": round(frame.scale[0], 3),
             "screen_size": [screen_w, screen_h],
-            "pixel_size": [original_w, original_h]
+            "pixel_size": [original_w, original_h],
+            "capture_backend": get_capture_backend().name,
+            "unchanged": False
         }
+        if key is not None:
+            self.last_saved[filepath] = {
+                "key": key, "digest": digest, "frame": frame,
+                "result": dict(result), "state": state, "encoded": encoded
+            }
+        return result
     
-    def convert_coords(self, x, y):
-        """Screenshot koordinatlarını gerçek ekran koordinatlarına dönüştür"""
+    def _encode_and_write(self, img, filepath, encoding=None, cache_key=None):
+        """Kodla ve teslim et → (EncodedImage, sonuç alanları: path / data / shm)
+        
+        Dosyaya sadece delivery "file" ya da persist ise yazılır.
+        """
+        options, mode, persist = delivery.split_options(encoding)
+        with metrics.timed("screenshot.encode"):
+            encoded = encoder.encode(img, cache_key=cache_key, **options)
+        
+        path = encoder.with_extension(filepath, encoded)
+        fields = delivery.deliver(encoded, path, mode, persist)
+        if "path" in fields:
+            # Başka formatta kalmış eski kopyayı sil (latest.jpg / latest.png karışmasın)
+            for extension in encoder.EXTENSIONS.values():
+                stale = os.path.splitext(filepath)[0] + extension
+                if stale != path and os.path.exists(stale):
+                    os.remove(stale)
+        return encoded, fields
+    
+    def convert_coords(self, x, y, screenshot_id=None):
+        """Screenshot koordinatlarını gerçek ekran koordinatlarına dönüştür
+        
+        screenshot_id verilirse o karenin dönüşümü (bölge ofseti dahil),
+        yoksa son tam ekran screenshot'ınınki kullanılır.
+        """
+        if screenshot_id:
+            return self.frames.require(screenshot_id).to_screen(x, y)
+        frame = self.frames.get(self.last_full_id) if self.last_full_id else None
+        if frame is not None:
+            return frame.to_screen(x, y)
         return int(x * self.scale_ratio), int(y * self.scale_ratio)
     
-    def take_reference(self):
+    def crop(self, screenshot_id, x, y, w, h, max_width=MAX_WIDTH, encoding=None, resize=None):
+        """Önbellekteki ham kareden yüksek çözünürlüklü bölge (yeniden yakalamadan)
+        
+        x, y, w, h kaynak screenshot'ın görüntü koordinatlarındadır. Sonuç
+        da yeni bir screenshot_id alır; bu id ile crop üzerinde tıklanabilir.
+        """
+        source = self.frames.require(screenshot_id or self.last_full_id)
+        px0, py0 = source.to_pixels(x, y)
+        px1, py1 = source.to_pixels(x + w, y + h)
+        box = (max(0, int(px0)), max(0, int(py0)),
+               min(source.image.width, int(round(px1))), min(source.image.height, int(round(py1))))
+        if box[2] <= box[0] or box[3] <= box[1]:
+            raise ValueError(f"Crop box is outside screenshot {source.id}")
+        
+        img = source.image.crop(box)
+        raw = img
+        if img.width > max_width:
+            with metrics.timed("screenshot.resize"):
+                img = imaging.resize(img, max_width, max(1, int(img.height * max_width / img.width)), resize)
+        
+        # Ham piksel → ekran: kaynağın dönüşümü üzerinden
+        screen_x0, screen_y0 = (int(round(v)) for v in source.pixels_to_screen(box[0], box[1]))
+        screen_x1, screen_y1 = (int(round(v)) for v in source.pixels_to_screen(box[2], box[3]))
+        frame = self.frames.add(raw, (screen_x0, screen_y0),
+                                ((screen_x1 - screen_x0) / img.width, (screen_y1 - screen_y0) / img.height),
+                                img.size, "crop")
+        
+        encoded, fields = self._encode_and_write(img, os.path.join(SCREENSHOT_DIR, "crop.jpg"), encoding)
+        return {
+            "status": "success",
+            "action": "crop",
+            "type": "crop",
+            "source_id": source.id,
+            "screenshot_id": frame.id,
+            "transform": frame.transform(),
+            **fields,
+            "width": img.width,
+            "height": img.height,
+            "size_kb": round(encoded.size / 1024, 1),
+            "encode": encoded.info(),
+            "zoom": round(source.scale[0] / frame.scale[0], 2),
+            "screen_box": [screen_x0, screen_y0, screen_x1 - screen_x0, screen_y1 - screen_y0]
+        }
+    
+    def take_reference(self, encoding=None, resize=None):
         """Tam ekran referans görüntüsü"""
-        img = pyautogui.screenshot()
-        result = self._resize_and_save(img, self.reference_path)
+        img = grab_screen()
+        self.previous_frame = img
+        result = self._resize_and_save(img, self.reference_path, key="reference", encoding=encoding,
+                                       resize=resize, kind="reference")
         self.reference_taken = True
         result["type"] = "reference"
         return result
     
-    def take_full(self):
+    def take_captured(self, img, region=None, kind="full", encoding=None, resize=None):
+        """Başka bir action'ın zaten yakaladığı kareden screenshot (yeniden yakalama yok)"""
+        if region is None:
+            self.previous_frame = img
+        filepath = self.latest_path if region is None else os.path.join(SCREENSHOT_DIR, "region.jpg")
+        key = (kind,) if region is None else (kind,) + tuple(region)
+        result = self._resize_and_save(img, filepath, key=key, encoding=encoding, resize=resize,
+                                       region=region, kind=kind)
+        result["type"] = "full" if region is None else "region"
+        return result
+    
+    def take_full(self, encoding=None, resize=None):
         """Tam ekran görüntüsü"""
-        img = pyautogui.screenshot()
-        result = self._resize_and_save(img, self.latest_path)
+        img = grab_screen()
+        self.previous_frame = img
+        result = self._resize_and_save(img, self.latest_path, key="full", encoding=encoding, resize=resize)
         result["type"] = "full"
         return result
     
-    def take_region(self, x, y, w, h):
+    def take_from_ring(self, frame, encoding=None):
+        """Arka plan ring buffer karesinden screenshot (yakalama/küçültme yok)"""
+        result = self._resize_and_save(frame.image, self.latest_path, key="ring", encoding=encoding,
+                                       pixel_size=frame.pixel_size, kind="ring")
+        result["type"] = "full"
+        result["source"] = "ring"
+        result["frame"] = frame.info()
+        return result
+    
+    def take_pyramid(self, encoding=None, tile_size=TILE_SIZE):
+        """Düşük çözünürlüklü genel bakış + karo indeksi (ayrıntı screenshot_tile ile)
+        
+        Seviye 0 genel bakıştır (ham kare 2^K kez yarıya indirilmiş, <= MAX_WIDTH);
+        her seviye bir öncekinin iki katı çözünürlük, son seviye ham karedir.
+        """
+        img = grab_screen()
+        self.previous_frame = img
+        halvings = 0
+        while -(-img.width // 2 ** halvings) > MAX_WIDTH:
+            halvings += 1
+        
+        with metrics.timed("screenshot.resize"):
+            pyramid = [img]
+            for _ in range(halvings):
+                pyramid.append(pyramid[-1].reduce(2))
+        result = self._resize_and_save(img, self.latest_path, key=("pyramid", tile_size), encoding=encoding,
+                                       kind="pyramid", output=pyramid[-1])
+        # Ara seviyeler karede saklanır - karo isteklerinde tekrar küçültme yok
+        frame = self.frames.get(result["screenshot_id"])
+        if len(frame.halvings) < len(pyramid):
+            frame.halvings = pyramid
+        
+        levels = []
+        for level in range(halvings + 1):
+            level_img = frame.halved(halvings - level)
+            levels.append({
+                "level": level,
+                "width": level_img.width,
+                "height": level_img.height,
+                "zoom": 2 ** level,
+                "cols": -(-level_img.width // tile_size),
+                "rows": -(-level_img.height // tile_size)
+            })
+        result["type"] = "pyramid"
+        result["pyramid"] = {"tile_size": tile_size, "levels": levels}
+        return result
+    
+    def tile(self, screenshot_id, level, col=None, row=None, x=None, y=None,
+             tile_size=TILE_SIZE, encoding=None):
+        """Piramit karosu: seviye + (col, row) veya genel bakış koordinatı (x, y)"""
+        source = self.frames.require(screenshot_id or self.last_full_id)
+        if source.kind != "pyramid":
+            raise ValueError(f"screenshot {source.id} is not a pyramid screenshot (use mode: pyramid)")
+        top = len(source.halvings) - 1       # Genel bakışa kadar yarılama sayısı
+        if not 0 <= level <= top:
+            raise ValueError(f"level must be between 0 and {top}")
+        
+        level_img = source.halved(top - level)
+        # Genel bakış pikseli → seviye pikseli
+        to_level = level_img.width / source.size[0]
+        if col is None or row is None:
+            if x is None or y is None:
+                raise ValueError("Give col/row or overview x/y")
+            col, row = int(x * to_level // tile_size), int(y * to_level // tile_size)
+        cols, rows = -(-level_img.width // tile_size), -(-level_img.height // tile_size)
+        if not (0 <= col < cols and 0 <= row < rows):
+            raise ValueError(f"Tile ({col}, {row}) outside level {level} grid {cols}x{rows}")
+        
+        box = (col * tile_size, row * tile_size,
+               min(level_img.width, (col + 1) * tile_size), min(level_img.height, (row + 1) * tile_size))
+        img = level_img.crop(box)
+        
+        screen_x0, screen_y0 = source.to_screen(box[0] / to_level, box[1] / to_level)
+        screen_x1, screen_y1 = source.to_screen(box[2] / to_level, box[3] / to_level)
+        frame = self.frames.add(img, (screen_x0, screen_y0),
+                                ((screen_x1 - screen_x0) / img.width, (screen_y1 - screen_y0) / img.height),
+                                img.size, "tile")
+        
+        encoded, fields = self._encode_and_write(img, os.path.join(SCREENSHOT_DIR, "tile.jpg"), encoding)
+        return {
+            "status": "success",
+            "action": "screenshot_tile",
+            "type": "tile",
+            "source_id": source.id,
+            "screenshot_id": frame.id,
+            "transform": frame.transform(),
+            "level": level,
+            "col": col,
+            "row": row,
+            "grid": [cols, rows],
+            **fields,
+            "width": img.width,
+            "height": img.height,
+            "size_kb": round(encoded.size / 1024, 1),
+            "encode": encoded.info(),
+            "screen_box": [screen_x0, screen_y0, screen_x1 - screen_x0, screen_y1 - screen_y0]
+        }
+    
+    def take_diff(self, threshold=DIFF_THRESHOLD, block=imaging.DIFF_BLOCK,
+                  tolerance=imaging.DIFF_TOLERANCE, max_regions=DIFF_MAX_REGIONS,
+                  encoding=None, resize=None):
+        """Önceki tam kareye göre sadece değişen bölgeler
+        
+        Değişen alan threshold oranını aşarsa (veya önceki kare yoksa)
+        normal tam ekran görüntüsü döner.
+        """
+        imaging.require_numpy()
+        img = grab_screen()
+        previous, self.previous_frame = self.previous_frame, img
+        
+        fallback = None
+        if previous is None:
+            fallback = "no_previous_frame"
+        elif previous.size != img.size or previous.mode != img.mode:
+            fallback = "size_changed"
+        else:
+            with metrics.timed("screenshot.diff"):
+                mask = imaging.changed_blocks(previous, img, block, tolerance)
+                changed_ratio = float(mask.mean())
+                if changed_ratio > threshold:
+                    fallback = "threshold"
+                else:
+                    boxes = imaging.block_regions(mask, block, img.size, max_regions)
+        
+        if fallback:
+            result = self._resize_and_save(img, self.latest_path, encoding=encoding, resize=resize, kind="diff")
+            result["type"] = "diff"
+            result["changed"] = True
+            result["fallback"] = fallback
+            if fallback == "threshold":
+                result["changed_ratio"] = round(changed_ratio, 4)
+            return result
+        
+        # Piksel → ekran koordinatı (HiDPI'da farklı olabilir)
+        screen_x, screen_y, screen_w, screen_h = screen_bounds()
+        to_screen = screen_w / img.width
+        regions = []
+        for i, (x, y, w, h) in enumerate(boxes):
+            x0, y0 = max(0, x - DIFF_PADDING), max(0, y - DIFF_PADDING)
+            x1 = min(img.width, x + w + DIFF_PADDING)
+            y1 = min(img.height, y + h + DIFF_PADDING)
+            crop = img.crop((x0, y0, x1, y1))
+            if crop.width > MAX_WIDTH:
+                with metrics.timed("screenshot.resize"):
+                    crop = imaging.resize(crop, MAX_WIDTH, int(crop.height * MAX_WIDTH / crop.width), resize)
+            filepath = os.path.join(SCREENSHOT_DIR, f"diff_{i}.jpg")
+            encoded, fields = self._encode_and_write(crop, filepath, encoding)
+            regions.append({
+                "box": [screen_x + round(x0 * to_screen), screen_y + round(y0 * to_screen),
+                        round((x1 - x0) * to_screen), round((y1 - y0) * to_screen)],
+                **fields,
+                "width": crop.width,
+                "height": crop.height,
+                "size_kb": round(encoded.size / 1024, 1),
+                "encode": encoded.info()
+            })
+        
+        # Ham kare önbellekte: crop ile değişen bölgeye ekran koordinatlarıyla (box ile aynı)
+        # zoom yapılabilir - görüntü koordinatı = ekran koordinatı, ham kare sanal masaüstü köşesinden başlar
+        frame = self.frames.add(img, (0, 0), (1.0, 1.0), (screen_w, screen_h), "diff",
+                                offset=(screen_x, screen_y))
+        
+        return {
+            "type": "diff",
+            "screenshot_id": frame.id,
+            "changed": bool(regions),
+            "changed_ratio": round(changed_ratio, 4),
+            "regions": regions,
+            "screen_size": [screen_w, screen_h],
+            "pixel_size": [img.width, img.height],
+            "size_kb": round(sum(r["size_kb"] for r in regions), 1),
+            "capture_backend": get_capture_backend().name
+        }
+    
+    def take_monitor(self, monitor="active", encoding=None, resize=None):
+        """Tek monitörün görüntüsü (sanal masaüstünün tamamı yerine)
+        
+        Dönüşüm o monitörün ofseti ve ölçeğiyle kaydedilir; screenshot_id'siz
+        screenshot_coords da bu kareye göre çevrilir.
+        """
+        target = get_monitor(monitor)
+        img = grab_screen(target.region)
+        filepath = os.path.join(SCREENSHOT_DIR, "monitor.jpg")
+        result = self._resize_and_save(img, filepath, key=("monitor",) + target.region, encoding=encoding,
+                                       resize=resize, region=target.region, kind="monitor")
+        result["type"] = "monitor"
+        result["monitor"] = target.info()
+        # HiDPI: ham piksel / mantıksal piksel
+        result["monitor"]["pixel_scale"] = round(img.width / target.width, 3)
+        return result
+    
+    def take_region(self, x, y, w, h, encoding=None, resize=None):
         """Belirli bölgenin görüntüsü"""
-        img = pyautogui.screenshot(region=(x, y, w, h))
+        img = grab_screen((x, y, w, h))
         filepath = os.path.join(SCREENSHOT_DIR, "region.jpg")
-        result = self._resize_and_save(img, filepath)
+        result = self._resize_and_save(img, filepath, key=("region", x, y, w, h), encoding=encoding,
+                                       resize=resize, region=(x, y, w, h), kind="region")
         result["type"] = "region"
         result["region"] = {"x": x, "y": y, "w": w, "h": h}
         return result
     
-    def take_active_window(self):
+    def take_active_window(self, encoding=None, resize=None):
         """Aktif pencere görüntüsü"""
         try:
             if sys.platform == "darwin":
@@ -121,7 +1025,7 @@ class ScreenshotManager:
                     parts = result.stdout.strip().split(",")
                     if len(parts) == 4:
                         x, y, w, h = int(parts[0]), int(parts[1]), int(parts[2]), int(parts[3])
-                        return self.take_region(x, y, w, h)
+                        return self.take_region(x, y, w, h, encoding, resize)
             
             elif sys.platform == "win32":
                 import ctypes
@@ -132,12 +1036,12 @@ class ScreenshotManager:
                 user32.GetWindowRect(hwnd, ctypes.byref(rect))
                 x, y = rect.left, rect.top
                 w, h = rect.right - rect.left, rect.bottom - rect.top
-                return self.take_region(x, y, w, h)
+                return self.take_region(x, y, w, h, encoding, resize)
             
-            return self.take_full()
+            return self.take_full(encoding, resize)
             
         except Exception as e:
-            result = self.take_full()
+            result = self.take_full(encoding, resize)
             result["warning"] = f"Active window detection failed: {str(e)}"
             return result
 
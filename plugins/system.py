@@ -4,11 +4,40 @@ System Plugin - Komut çalıştırma, terminal, durum bilgisi
 
 import os
 import sys
+import time
+import signal
 import subprocess
 
 import pyautogui
 
-from .shared import screenshot_mgr, MAX_WIDTH
+from .shared import screenshot_mgr, MAX_WIDTH, list_monitors, screen_bounds
+from .context import CommandCancelled, current_context
+
+
+def _kill_process_tree(proc):
+    """Shell ve altındaki tüm süreçleri sonlandır"""
+    try:
+        if sys.platform == "win32":
+            subprocess.run(["taskkill", "/T", "/F", "/PID", str(proc.pid)], capture_output=True)
+        else:
+            os.killpg(proc.pid, signal.SIGKILL)
+    except (OSError, ProcessLookupError):
+        proc.kill()
+
+
+def _communicate(proc, timeout):
+    """Çıktıyı topla; timeout veya komut iptalinde süreç ağacını öldür"""
+    context = current_context()
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return proc.communicate(timeout=0.1)
+        except subprocess.TimeoutExpired:
+            if context.cancelled or time.monotonic() >= deadline:
+                _kill_process_tree(proc)
+                proc.communicate()
+                context.check()
+                raise
 
 
 def run_command(params):
@@ -42,21 +71,25 @@ def run_command(params):
                 "background": True
             }
         else:
-            # Blocking - normal komutlar için
-            result = subprocess.run(
-                command, shell=True, capture_output=True, text=True,
-                cwd=cwd, timeout=timeout
+            # Blocking - normal komutlar için (iptal edilebilir)
+            proc = subprocess.Popen(
+                command, shell=True, cwd=cwd, text=True,
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                start_new_session=sys.platform != "win32"
             )
+            stdout, stderr = _communicate(proc, timeout)
             return {
                 "status": "success",
                 "command": command,
                 "cwd": cwd or os.getcwd(),
-                "returncode": result.returncode,
-                "stdout": result.stdout,
-                "stderr": result.stderr
+                "returncode": proc.returncode,
+                "stdout": stdout,
+                "stderr": stderr
             }
     except subprocess.TimeoutExpired:
         return {"status": "error", "message": "Command timed out"}
+    except CommandCancelled:
+        raise
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
@@ -121,15 +154,21 @@ def terminal_run(params):
 
 
 def screen_info(params):
-    """Ekran bilgisi"""
+    """Ekran bilgisi + bağlı monitörler"""
     w, h = pyautogui.size()
+    monitors = list_monitors(refresh=bool(params.get("refresh")))
+    desktop = screen_bounds()
+    # Tam ekran screenshot tüm sanal masaüstünü kapsar; birincil monitörün genişliği değil.
+    # Kesin eşleme her screenshot'ın "transform" alanındadır.
     return {
         "status": "success",
         "width": w,
         "height": h,
         "platform": sys.platform,
         "screenshot_width": MAX_WIDTH,
-        "scale_ratio": round(w / MAX_WIDTH, 3)
+        "scale_ratio": round(desktop[2] / min(desktop[2], MAX_WIDTH), 3),
+        "virtual_desktop": list(desktop),
+        "monitors": [m.info() for m in monitors]
     }
 
 
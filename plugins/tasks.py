@@ -6,6 +6,8 @@ import os
 import json
 import time
 
+from .context import CommandCancelled, check_cancelled, interruptible_sleep
+
 BRIDGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 TASKS_DIR = os.path.join(BRIDGE_DIR, "tasks")
 
@@ -48,13 +50,26 @@ def run_task(params, handlers):
     if not steps:
         return {"status": "error", "message": "Task has no steps"}
     
+    # wait_after'ı baştan doğrula - yarıda kalıp yan etki bırakmasın
+    for i, step in enumerate(steps):
+        wait_after = step.get("wait_after", 0) if isinstance(step, dict) else 0
+        if wait_after != "stable" and (isinstance(wait_after, bool)
+                                       or not isinstance(wait_after, (int, float))):
+            return {
+                "status": "error",
+                "message": f'Step {i + 1}: wait_after must be a number of seconds or "stable", '
+                           f'got {wait_after!r}'
+            }
+    
     results = []
     
     for i, step in enumerate(steps):
         action = step.get("action", "")
         step_params = step.get("params", {})
         step_name = step.get("name", f"Step {i+1}")
-        wait_after = step.get("wait_after", 0)  # Adımdan sonra bekle (saniye)
+        wait_after = step.get("wait_after", 0)  # Adımdan sonra bekle (saniye veya "stable")
+        
+        check_cancelled()
         
         if not action:
             results.append({
@@ -68,7 +83,7 @@ def run_task(params, handlers):
         # Özel action: wait
         if action == "wait":
             seconds = step_params.get("seconds", 1)
-            time.sleep(seconds)
+            interruptible_sleep(seconds)
             results.append({
                 "step": i + 1,
                 "name": step_name,
@@ -89,6 +104,8 @@ def run_task(params, handlers):
                     "status": result.get("status", "success"),
                     "result": result
                 })
+            except CommandCancelled:
+                raise
             except Exception as e:
                 results.append({
                     "step": i + 1,
@@ -106,9 +123,11 @@ def run_task(params, handlers):
                 "message": f"Unknown action: {action}"
             })
         
-        # Adımdan sonra bekle
-        if wait_after > 0:
-            time.sleep(wait_after)
+        # Adımdan sonra bekle ("stable": sabit süre yerine ekran durulana kadar)
+        if wait_after == "stable":
+            handlers["wait_screen_stable"]({"screenshot": False})
+        elif wait_after > 0:
+            interruptible_sleep(wait_after)
     
     # Özet
     success_count = sum(1 for r in results if r.get("status") == "success")
@@ -125,6 +144,81 @@ def run_task(params, handlers):
     }
 
 
+def run_batch(params, handlers):
+    """Adım listesini tek seferde çalıştır (tasks/ dosyası gerekmez)"""
+    steps = params.get("steps", [])
+    stop_on_error = params.get("stop_on_error", True)
+    
+    if not isinstance(steps, list) or not steps:
+        return {"status": "error", "message": "steps required (list of {action, params})"}
+    
+    results = []
+    errors = 0
+    batch_start = time.perf_counter()
+    
+    for i, step in enumerate(steps):
+        start = time.perf_counter()
+        check_cancelled()
+        
+        # Bozuk adım sadece kendi sonucunu hatalı yapar, batch'i düşürmez
+        if not isinstance(step, dict):
+            action = ""
+            result = {"status": "error", "message": "step must be an object {action, params}"}
+        else:
+            action = step.get("action", "")
+            step_params = step.get("params", {})
+            if not isinstance(step_params, dict):
+                result = {"status": "error", "message": "params must be an object"}
+            elif action == "wait" or action in handlers:
+                try:
+                    if action == "wait":
+                        interruptible_sleep(step_params.get("seconds", 1))
+                        result = {"status": "success"}
+                    else:
+                        result = handlers[action](step_params)
+                except CommandCancelled:
+                    raise
+                except Exception as e:
+                    result = {"status": "error", "message": str(e)}
+            else:
+                result = {"status": "error", "message": f"Unknown action: {action}"}
+        
+        status = result.pop("status", "success")
+        result.pop("action", None)
+        entry = {
+            "step": i + 1,
+            "action": action,
+            "status": status,
+            "ms": round((time.perf_counter() - start) * 1000, 1)
+        }
+        if result:
+            entry["result"] = result
+        results.append(entry)
+        
+        if status == "error":
+            errors += 1
+            if stop_on_error:
+                break
+    
+    if errors == 0:
+        status = "success"
+    elif errors == len(results):
+        status = "error"
+    else:
+        status = "partial"
+    
+    return {
+        "status": status,
+        "action": "batch",
+        "total_steps": len(steps),
+        "executed": len(results),
+        "errors": errors,
+        "stopped": stop_on_error and errors > 0 and len(results) < len(steps),
+        "elapsed_ms": round((time.perf_counter() - batch_start) * 1000, 1),
+        "results": results
+    }
+
+
 def list_tasks(params):
     """Mevcut task'ları listele"""
     if not os.path.exists(TASKS_DIR):
@@ -0,0 +1,541 @@
+"""
+Vision Plugin - ekranda yerel arama
+===================================
+Model'e screenshot gönderip koordinat tahmin ettirmek yerine ekran
+karesi üzerinde yerel olarak çalışan aramalar. Sonuçlar doğrudan
+click'e verilebilecek gerçek ekran koordinatlarıdır.
+
+wait_screen_stable / wait_screen_change: sabit wait/sleep yerine küçük
+örnek karelerle ekranın durulmasını veya değişmesini bekler.
+@observable: giriş action'larına "observe" seçeneği (yap, durulmasını
+bekle, sonucu aynı yanıtta döndür).
+find_text: yerel OCR (Tesseract) ile kelime kutuları; kare hash'iyle önbellekli.
+"""
+
+import os
+import time
+import threading
+import functools
+from collections import OrderedDict
+
+from PIL import Image
+
+# OCR (opsiyonel): pytesseract + tesseract binary
+try:
+    import pytesseract
+    OCR_AVAILABLE = True
+except ImportError:
+    pytesseract = None
+    OCR_AVAILABLE = False
+
+from .shared import screenshot_mgr, grab_screen, screen_bounds, BRIDGE_DIR
+from .context import interruptible_sleep, time_left
+from . import imaging, encoder, delivery
+
+TEMPLATE_CACHE_SIZE = 32    # Ön işlenmiş şablon sayısı
+MATCH_THRESHOLD = 0.8
+
+SETTLE_SAMPLE_WIDTH = 160   # Örnek kare genişliği (1080p → 160x90)
+SETTLE_INTERVAL = 0.02      # Örnekler arası bekleme (saniye)
+SETTLE_STABLE_MS = 300      # Bu kadar süre değişmezse "durdu"
+SETTLE_TIMEOUT = 5.0
+SETTLE_MIN_CHANGE = 0.002   # Örnek piksellerin bu oranından azı değişirse yok say (imleç yanıp sönmesi)
+
+OCR_LANG = os.environ.get("BRIDGE_OCR_LANG", "eng")
+OCR_CONFIG = "--psm 11"     # Seyrek metin: UI etiketleri paragraf değil
+OCR_MIN_CONFIDENCE = 60
+OCR_UPSCALE_MAX_PIXELS = 1_000_000  # Bundan küçük alanlar 2x büyütülür (küçük UI yazısı)
+OCR_TIMEOUT = 20.0
+OCR_CACHE_SIZE = 8
+
+_templates = OrderedDict()
+_templates_lock = threading.Lock()
+_search_cache = {}          # Tek girişlik: (kare id, ROI) → gri piramit
+_ocr_cache = OrderedDict()  # (kare hash, dil, ölçek) → kelimeler
+_ocr_lock = threading.Lock()
+
+
+def _region_tuple(region):
+    if not region:
+        return None
+    return tuple(int(region[k]) for k in ("x", "y", "w", "h"))
+
+
+def load_template(spec):
+    """Şablonu yükle ve ön işle (önbellekli) → (ad, TemplatePyramid)
+
+    spec: dosya yolu (göreli ise bridge dizinine göre) veya önbellekteki bir
+    screenshot'tan kesit: {"screenshot_id": "s12", "x", "y", "w", "h"}
+    (o screenshot'ın görüntü koordinatları). Şablonlar ekran piksel
+    ölçeğinde olmalıdır - küçültülmüş screenshot'tan kesilen dosya uymaz.
+    """
+    if isinstance(spec, dict):
+        frame = screenshot_mgr.frames.require(spec.get("screenshot_id"))
+        box = tuple(float(spec[k]) for k in ("x", "y", "w", "h"))
+        key = ("frame", frame.id, box)
+        name = f"{frame.id}:{','.join(f'{v:g}' for v in box)}"
+    else:
+        path = spec if os.path.isabs(spec) else os.path.join(BRIDGE_DIR, spec)
+        if not os.path.exists(path):
+            raise ValueError(f"Template not found: {spec}")
+        key = ("file", path, os.path.getmtime(path))
+        name = spec
+
+    with _templates_lock:
+        cached = _templates.get(key)
+        if cached:
+            _templates.move_to_end(key)
+            return name, cached
+
+    if isinstance(spec, dict):
+        x, y, w, h = box
+        px0, py0 = frame.to_pixels(x, y)
+        px1, py1 = frame.to_pixels(x + w, y + h)
+        img = frame.image.crop((int(px0), int(py0), int(round(px1)), int(round(py1))))
+    else:
+        with Image.open(path) as source:
+            img = source.convert("RGB")
+    if img.width < 2 or img.height < 2:
+        raise ValueError(f"Template too small: {name}")
+    template = imaging.TemplatePyramid(img)
+
+    with _templates_lock:
+        _templates[key] = template
+        while len(_templates) > TEMPLATE_CACHE_SIZE:
+            _templates.popitem(last=False)
+    return name, template
+
+
+def _search_frame(params):
+    """Aranacak kare + ham piksel ROI'si → (CachedFrame, (x0, y0, x1, y1))
+
+    screenshot_id verilirse önbellekteki kare kullanılır (yeniden yakalama
+    yok), yoksa ekran (veya sadece region) yakalanıp önbelleğe eklenir.
+    """
+    region = _region_tuple(params.get("region"))
+    if params.get("screenshot_id"):
+        frame = screenshot_mgr.frames.require(params["screenshot_id"])
+        if region is None:
+            return frame, (0, 0, frame.image.width, frame.image.height)
+        x, y, w, h = region
+        px0, py0 = frame.screen_to_pixels(x, y)
+        px1, py1 = frame.screen_to_pixels(x + w, y + h)
+        box = (max(0, int(px0)), max(0, int(py0)),
+               min(frame.image.width, int(round(px1))), min(frame.image.height, int(round(py1))))
+        if box[2] <= box[0] or box[3] <= box[1]:
+            raise ValueError(f"Region is outside screenshot {frame.id}")
+        return frame, box
+
+    img = grab_screen(region, phase="vision.capture")
+    x, y, w, h = region or screen_bounds()
+    frame = screenshot_mgr.frames.add(img, (x, y), (w / img.width, h / img.height), img.size, "find")
+    return frame, (0, 0, img.width, img.height)
+
+
+def _search_pyramid(frame, box, levels):
+    key = (frame.id, box, levels)
+    pyramid = _search_cache.get(key)
+    if pyramid is None:
+        img = frame.image
+        if box != (0, 0, img.width, img.height):
+            img = img.crop(box)
+        pyramid = imaging.gray_pyramid(img, levels)
+        _search_cache.clear()
+        _search_cache[key] = pyramid
+    return pyramid
+
+
+def find_image(params):
+    """Ekranda şablon görüntü(ler) ara (kabadan inceye NumPy piramit eşleme)
+
+    {"template": "templates/save.png", "threshold": 0.8, "max_results": 1,
+     "region": {"x": 0, "y": 0, "w": 800, "h": 600}, "screenshot_id": "s12"}
+    Birden çok şablon için "templates": [...]. Eşleşmeler gerçek ekran
+    koordinatlarıdır (x, y = merkez; click'e doğrudan verilebilir).
+    """
+    specs = params.get("templates") or ([params["template"]] if params.get("template") else [])
+    if not specs:
+        return {"status": "error", "message": "Missing parameter: template"}
+    threshold = float(params.get("threshold", MATCH_THRESHOLD))
+    max_results = max(1, int(params.get("max_results", 1)))
+
+    try:
+        imaging.require_numpy()
+        start = time.perf_counter()
+        templates = [load_template(spec) for spec in specs]
+        frame, box = _search_frame(params)
+        levels = max(len(template.levels) for _, template in templates)
+        search = _search_pyramid(frame, box, levels)
+
+        matches = []
+        missing = []
+        for name, template in templates:
+            hits = imaging.match_template(search, template, threshold, max_results)
+            if not hits:
+                missing.append(name)
+            for x, y, w, h, score in hits:
+                left, top = frame.pixels_to_screen(box[0] + x, box[1] + y)
+                right, bottom = frame.pixels_to_screen(box[0] + x + w, box[1] + y + h)
+                matches.append({
+                    "template": name,
+                    "score": round(score, 4),
+                    "x": int(round((left + right) / 2)),
+                    "y": int(round((top + bottom) / 2)),
+                    "box": [int(round(left)), int(round(top)),
+                            int(round(right - left)), int(round(bottom - top))]
+                })
+    except (RuntimeError, ValueError) as e:
+        return {"status": "error", "message": str(e)}
+
+    return {
+        "status": "success",
+        "action": "find_image",
+        "found": bool(matches),
+        "matches": matches,
+        "missing": missing,
+        "screenshot_id": frame.id,
+        "search_ms": round((time.perf_counter() - start) * 1000, 1)
+    }
+
+
+# ============== OCR ==============
+def require_ocr():
+    if not OCR_AVAILABLE:
+        raise RuntimeError("pytesseract not installed. Run: pip install pytesseract "
+                           "(and install the tesseract binary)")
+
+
+def ocr_words(img, lang=OCR_LANG, scale=1):
+    """Gri kare → [{"text", "conf", "box": (x, y, w, h), "line"}] (img pikselinde)
+
+    Aynı piksel + dil + ölçek için sonuç önbellekten döner (değişmemiş
+    ekranda tekrarlanan sorgular OCR çalıştırmaz). → (kelimeler, önbellekten mi)
+    """
+    key = (imaging.frame_digest(img), lang, scale)
+    with _ocr_lock:
+        cached = _ocr_cache.get(key)
+        if cached is not None:
+            _ocr_cache.move_to_end(key)
+            return cached, True
+
+    source = img.resize((img.width * scale, img.height * scale), Image.LANCZOS) if scale > 1 else img
+    try:
+        data = pytesseract.image_to_data(source, lang=lang, config=OCR_CONFIG,
+                                         output_type=pytesseract.Output.DICT,
+                                         timeout=time_left(OCR_TIMEOUT))
+    except pytesseract.TesseractNotFoundError as e:
+        raise RuntimeError(str(e))
+    words = []
+    for i, text in enumerate(data["text"]):
+        text = text.strip()
+        confidence = float(data["conf"][i])
+        if not text or confidence < 0:
+            continue
+        words.append({
+            "text": text,
+            "conf": confidence,
+            "box": (data["left"][i] / scale, data["top"][i] / scale,
+                    data["width"][i] / scale, data["height"][i] / scale),
+            "line": (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+        })
+
+    with _ocr_lock:
+        _ocr_cache[key] = words
+        while len(_ocr_cache) > OCR_CACHE_SIZE:
+            _ocr_cache.popitem(last=False)
+    return words, False
+
+
+def _match_words(words, query, exact=False):
+    """Sorguyla eşleşen ardışık kelime grupları (aynı satırda, büyük/küçük harf duyarsız)
+
+    Tek kelimelik sorgu: exact değilse kelimenin içinde geçmesi yeterli.
+    Çok kelimelik: iç kelimeler birebir, ilk kelime sonu / son kelime başı eşleşir.
+    """
+    tokens = query.casefold().split()
+    if not tokens:
+        return []
+    found = []
+    for start in range(len(words) - len(tokens) + 1):
+        group = words[start:start + len(tokens)]
+        if any(word["line"] != group[0]["line"] for word in group):
+            continue
+        texts = [word["text"].casefold() for word in group]
+        if exact:
+            matched = texts == tokens
+        elif len(tokens) == 1:
+            matched = tokens[0] in texts[0]
+        else:
+            matched = (texts[0].endswith(tokens[0]) and texts[-1].startswith(tokens[-1]) and
+                       texts[1:-1] == tokens[1:-1])
+        if matched:
+            found.append(group)
+    return found
+
+
+def find_text(params):
+    """Ekrandaki metni yerel OCR ile bul → kelime kutuları (gerçek ekran koordinatı)
+
+    {"text": "Save as", "exact": false, "region": {...}, "screenshot_id": "s12",
+     "lang": "eng", "min_confidence": 60}
+    text verilmezse tanınan tüm kelimeler döner. Sonuçlar kare hash'iyle
+    önbelleklenir; region vermek OCR'ı belirgin şekilde hızlandırır.
+    """
+    query = params.get("text", "")
+    min_confidence = float(params.get("min_confidence", OCR_MIN_CONFIDENCE))
+    max_results = int(params.get("max_results", 50 if query else 500))
+
+    try:
+        require_ocr()
+        start = time.perf_counter()
+        frame, box = _search_frame(params)
+        img = frame.image
+        if box != (0, 0, img.width, img.height):
+            img = img.crop(box)
+        img = img.convert("L")
+        scale = int(params.get("scale", 2 if img.width * img.height <= OCR_UPSCALE_MAX_PIXELS else 1))
+        words, cached = ocr_words(img, params.get("lang", OCR_LANG), max(1, scale))
+        words = [word for word in words if word["conf"] >= min_confidence]
+        groups = _match_words(words, query, bool(params.get("exact"))) if query else [[w] for w in words]
+
+        matches = []
+        for group in groups[:max_results]:
+            x0 = min(w["box"][0] for w in group)
+            y0 = min(w["box"][1] for w in group)
+            x1 = max(w["box"][0] + w["box"][2] for w in group)
+            y1 = max(w["box"][1] + w["box"][3] for w in group)
+            left, top = frame.pixels_to_screen(box[0] + x0, box[1] + y0)
+            right, bottom = frame.pixels_to_screen(box[0] + x1, box[1] + y1)
+            matches.append({
+                "text": " ".join(w["text"] for w in group),
+                "confidence": round(min(w["conf"] for w in group), 1),
+                "x": int(round((left + right) / 2)),
+                "y": int(round((top + bottom) / 2)),
+                "box": [int(round(left)), int(round(top)),
+                        int(round(right - left)), int(round(bottom - top))]
+            })
+    except (RuntimeError, ValueError) as e:
+        return {"status": "error", "message": str(e)}
+
+    return {
+        "status": "success",
+        "action": "find_text",
+        "found": bool(matches),
+        "matches": matches,
+        "words": len(words),
+        "cached": cached,
+        "screenshot_id": frame.id,
+        "ocr_ms": round((time.perf_counter() - start) * 1000, 1)
+    }
+
+
+# ============== EKRAN DURULMASI ==============
+class ScreenWatcher:
+    """Bir ekran bölgesini küçük örnek karelerle izler
+
+    Her örnekte tam çözünürlüklü kare yakalanır (son kare screenshot olarak
+    döndürülebilsin diye) ama karşılaştırma ~160 px genişliğinde gri
+    kopyada yapılır; örnek başına maliyet neredeyse sadece yakalama.
+    """
+
+    def __init__(self, region=None, tolerance=imaging.DIFF_TOLERANCE, min_change=SETTLE_MIN_CHANGE):
+        self.region = region
+        self.tolerance = tolerance
+        self.min_change = min_change
+        self.started = time.perf_counter()
+        self.samples = 0
+        self.image = None
+        self.sample = None
+        self.capture()
+
+    def capture(self):
+        self.image = grab_screen(self.region, phase="vision.sample")
+        self.sample = imaging.sample_frame(self.image, SETTLE_SAMPLE_WIDTH)
+        self.samples += 1
+        return self.sample
+
+    def change(self, baseline):
+        """Son örneğin baseline'a göre değişimi → (oran, ekran kutusu) veya (oran, None)"""
+        ratio, bbox = imaging.sample_change(baseline, self.sample, self.tolerance)
+        if ratio <= self.min_change or bbox is None:
+            return ratio, None
+        return ratio, self.to_screen(bbox)
+
+    def to_screen(self, bbox):
+        """Örnek kare kutusu → [x, y, w, h] ekran koordinatı"""
+        x, y, w, h = self.region or screen_bounds()
+        sx, sy = w / self.sample.width, h / self.sample.height
+        x0, y0 = x + int(bbox[0] * sx), y + int(bbox[1] * sy)
+        x1, y1 = x + int(round(bbox[2] * sx)), y + int(round(bbox[3] * sy))
+        return [x0, y0, x1 - x0, y1 - y0]
+
+    def elapsed_ms(self):
+        return round((time.perf_counter() - self.started) * 1000, 1)
+
+    def wait_stable(self, stable_ms=SETTLE_STABLE_MS, timeout=SETTLE_TIMEOUT, interval=SETTLE_INTERVAL):
+        """stable_ms boyunca değişmeyene kadar örnekle → (durdu mu, değişim sayısı, birleşik kutu)"""
+        baseline = self.sample
+        last_change = time.perf_counter()
+        deadline = self.started + timeout
+        changes = 0
+        union = None
+        while True:
+            now = time.perf_counter()
+            if (now - last_change) * 1000 >= stable_ms:
+                return True, changes, union
+            if now >= deadline:
+                return False, changes, union
+            interruptible_sleep(min(interval, max(0.0, deadline - now)))
+            self.capture()
+            ratio, box = self.change(baseline)
+            if box:
+                # Değişimi yeni taban kabul et (yavaş animasyonlar da birikerek yakalanır)
+                baseline = self.sample
+                last_change = time.perf_counter()
+                changes += 1
+                union = box if union is None else _union(union, box)
+
+    def wait_change(self, timeout=SETTLE_TIMEOUT, interval=SETTLE_INTERVAL):
+        """İlk örneğe göre değişim olana kadar örnekle → (değişim oranı, kutu) veya (oran, None)"""
+        baseline = self.sample
+        deadline = self.started + timeout
+        ratio = 0.0
+        while time.perf_counter() < deadline:
+            interruptible_sleep(min(interval, max(0.0, deadline - time.perf_counter())))
+            self.capture()
+            ratio, box = self.change(baseline)
+            if box:
+                return ratio, box
+        return ratio, None
+
+    def screenshot(self, params):
+        """Son yakalanan kare → normal screenshot sonucu (screenshot_id ile)"""
+        encoding = {**encoder.options_from_params(params), **delivery.options_from_params(params)}
+        return screenshot_mgr.take_captured(self.image, self.region, kind="settle",
+                                            encoding=encoding, resize=params.get("resize"))
+
+
+def _union(a, b):
+    x0, y0 = min(a[0], b[0]), min(a[1], b[1])
+    x1, y1 = max(a[0] + a[2], b[0] + b[2]), max(a[1] + a[3], b[1] + b[3])
+    return [x0, y0, x1 - x0, y1 - y0]
+
+
+def _watcher(params):
+    return ScreenWatcher(
+        region=_region_tuple(params.get("region")),
+        tolerance=int(params.get("tolerance", imaging.DIFF_TOLERANCE)),
+        min_change=float(params.get("min_change", SETTLE_MIN_CHANGE))
+    )
+
+
+def wait_screen_stable(params):
+    """Ekran (veya region) stable_ms boyunca değişmeyene kadar bekle
+
+    {"stable_ms": 300, "timeout": 5, "region": {...}, "screenshot": true}
+    Sonuçta geçen süre ve son kare (screenshot: false ile atlanır).
+    """
+    try:
+        watcher = _watcher(params)
+        stable, changes, box = watcher.wait_stable(
+            stable_ms=float(params.get("stable_ms", SETTLE_STABLE_MS)),
+            timeout=time_left(float(params.get("timeout", SETTLE_TIMEOUT))),
+            interval=float(params.get("interval", SETTLE_INTERVAL))
+        )
+        result = {
+            "status": "success" if stable else "timeout",
+            "action": "wait_screen_stable",
+            "stable": stable,
+            "elapsed_ms": watcher.elapsed_ms(),
+            "samples": watcher.samples,
+            "changes": changes,
+            "changed_box": box
+        }
+        if params.get("screenshot", True):
+            result["screenshot"] = watcher.screenshot(params)
+        return result
+    except (RuntimeError, ValueError) as e:
+        return {"status": "error", "message": str(e)}
+
+
+def wait_screen_change(params):
+    """Ekran (veya region) değişene kadar bekle
+
+    {"timeout": 5, "region": {...}, "tolerance": 16, "min_change": 0.002}
+    Sonuçta değişen kutu (ekran koordinatı), geçen süre ve son kare.
+    """
+    try:
+        watcher = _watcher(params)
+        ratio, box = watcher.wait_change(
+            timeout=time_left(float(params.get("timeout", SETTLE_TIMEOUT))),
+            interval=float(params.get("interval", SETTLE_INTERVAL))
+        )
+        result = {
+            "status": "success" if box else "timeout",
+            "action": "wait_screen_change",
+            "changed": box is not None,
+            "changed_ratio": round(ratio, 4),
+            "changed_box": box,
+            "elapsed_ms": watcher.elapsed_ms(),
+            "samples": watcher.samples
+        }
+        if params.get("screenshot", True):
+            result["screenshot"] = watcher.screenshot(params)
+        return result
+    except (RuntimeError, ValueError) as e:
+        return {"status": "error", "message": str(e)}
+
+
+# ============== ACT-AND-OBSERVE ==============
+def observe(params, perform):
+    """perform() ile girişi yap; params["observe"] varsa ekran durulana kadar bekle
+
+    observe: true veya {"stable_ms", "timeout", "region", "tolerance",
+    "min_change", "interval"} + screenshot çıktı seçenekleri (format, delivery...).
+    Giriş öncesi örnek alınır; değişen kutu giriş öncesi ile son kare arasındadır.
+    """
+    options = params.get("observe")
+    if not options:
+        return perform()
+    options = options if isinstance(options, dict) else {}
+
+    watcher = _watcher(options)
+    before = watcher.sample
+    result = perform()
+    if result.get("status") == "error":
+        return result
+
+    watcher.started = time.perf_counter()
+    stable, changes, _ = watcher.wait_stable(
+        stable_ms=float(options.get("stable_ms", SETTLE_STABLE_MS)),
+        timeout=time_left(float(options.get("timeout", SETTLE_TIMEOUT))),
+        interval=float(options.get("interval", SETTLE_INTERVAL))
+    )
+    ratio, box = watcher.change(before)
+    result["observe"] = {
+        "stable": stable,
+        "changed": box is not None,
+        "changed_box": box,
+        "changed_ratio": round(ratio, 4),
+        "elapsed_ms": watcher.elapsed_ms(),
+        "samples": watcher.samples,
+        "screenshot": watcher.screenshot(options)
+    }
+    return result
+
+
+def observable(handler):
+    """Giriş action'ını observe seçeneğiyle sar"""
+    @functools.wraps(handler)
+    def wrapper(params):
+        return observe(params, lambda: handler(params))
+    return wrapper
+
+
+# Dışa açılan action'lar
+ACTIONS = {
+    "find_image": find_image,
+    "wait_screen_stable": wait_screen_stable,
+    "wait_screen_change": wait_screen_change,
+    "find_text": find_text,
+}
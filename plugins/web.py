@@ -2,6 +2,7 @@
 Web/Selenium Plugin - Browser automation ve web parsing
 """
 
+import io
 import os
 import sys
 import time
@@ -23,8 +24,103 @@ try:
     SELENIUM_AVAILABLE = True
 except ImportError:
     SELENIUM_AVAILABLE = False
+    
+    # Selenium yoksa da plugin yüklenebilsin (anlamlı hata mesajı, sahte driver ile benchmark)
+    class By:
+        ID = "id"
+        CLASS_NAME = "class name"
+        CSS_SELECTOR = "css selector"
+        XPATH = "xpath"
+        LINK_TEXT = "link text"
+        PARTIAL_LINK_TEXT = "partial link text"
+        TAG_NAME = "tag name"
+        NAME = "name"
+    
+    class WebDriverException(Exception):
+        pass
+    
+    class TimeoutException(WebDriverException):
+        pass
+    
+    class NoSuchElementException(WebDriverException):
+        pass
+
+from .shared import BRIDGE_DIR, SCREENSHOT_DIR, MAX_WIDTH
+from . import encoder, imaging, delivery
+from .context import CommandCancelled, check_cancelled, time_left
+from .metrics import metrics
+
+
+# Uzak çağrı yapan (round trip) driver property'leri
+REMOTE_PROPERTIES = {"title", "current_url", "page_source", "window_handles", "current_window_handle"}
+# ... ve WebElement property'leri
+REMOTE_ELEMENT_PROPERTIES = {"text", "rect", "location", "size", "tag_name", "location_once_scrolled_into_view"}
+
+
+class _TimedProxy:
+    """Selenium nesnesi proxy'si - her round trip'i "<prefix>.<isim>" olarak ölçer.
+    Dönen WebElement'ler de sarılır, argüman olarak verilenler açılır."""
+    
+    prefix = "selenium"
+    remote = REMOTE_PROPERTIES
+    
+    def __init__(self, target):
+        self._target = target
+    
+    def __getattr__(self, name):
+        # metrics.timed yerine doğrudan perf_counter: elemanlarda çağrı sayısı yüksek
+        phase = f"{self.prefix}.{name}"
+        if name in self.remote:
+            start = time.perf_counter()
+            try:
+                return getattr(self._target, name)
+            finally:
+                metrics.record_phase(phase, time.perf_counter() - start)
+        
+        value = getattr(self._target, name)
+        if not callable(value):
+            return value
+        
+        def timed_call(*args, **kwargs):
+            args = [_unwrap(arg) for arg in args]
+            start = time.perf_counter()
+            try:
+                result = value(*args, **kwargs)
+            finally:
+                metrics.record_phase(phase, time.perf_counter() - start)
+            return _wrap(result)
+        return timed_call
 
-from .shared import BRIDGE_DIR, SCREENSHOT_DIR, MAX_WIDTH, JPEG_QUALITY
+
+class TimedDriver(_TimedProxy):
+    """WebDriver proxy'si - "selenium.<isim>" """
+
+
+class TimedElement(_TimedProxy):
+    """WebElement proxy'si - "selenium.element.<isim>" (text, rect, click ...)"""
+    
+    prefix = "selenium.element"
+    remote = REMOTE_ELEMENT_PROPERTIES
+
+
+def _is_element(value):
+    """WebElement (ya da aynı arayüzdeki sahte eleman)"""
+    return not isinstance(value, _TimedProxy) and hasattr(value, "is_displayed") and hasattr(value, "click")
+
+
+def _wrap(value):
+    if isinstance(value, list):
+        return [TimedElement(item) if _is_element(item) else item for item in value]
+    return TimedElement(value) if _is_element(value) else value
+
+
+def _unwrap(value):
+    """execute_script vb.'ne verilen sarılı elemanı Selenium'un tanıdığı nesneye çevir"""
+    if isinstance(value, TimedElement):
+        return value._target
+    if isinstance(value, (list, tuple)):
+        return type(value)(_unwrap(item) for item in value)
+    return value
 
 
 # ============== SESSION YÖNETİMİ ==============
@@ -64,7 +160,7 @@ class WebSession:
             
             # WebDriver başlat
             service = Service(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(service=service, options=options)
+            self.driver = TimedDriver(webdriver.Chrome(service=service, options=options))
             self.driver.implicitly_wait(5)
             self.is_open = True
             
@@ -118,6 +214,14 @@ def get_by(by_str):
     return BY_MAP.get(by_str.lower(), By.CSS_SELECTOR)
 
 
+def wait_until(condition, timeout):
+    """WebDriverWait - komut iptal edilince veya deadline dolunca erken çıkar"""
+    def check(driver):
+        check_cancelled()
+        return condition(driver)
+    return WebDriverWait(session.driver, time_left(timeout)).until(check)
+
+
 # ============== ACTION HANDLERS ==============
 
 def web_open(params):
@@ -288,9 +392,7 @@ def web_exists(params):
     try:
         if timeout > 0:
             # Belirli süre bekle
-            WebDriverWait(session.driver, timeout).until(
-                EC.presence_of_element_located((get_by(by), selector))
-            )
+            wait_until(EC.presence_of_element_located((get_by(by), selector)), timeout)
             return {"status": "success", "action": "web_exists", "exists": True, "selector": selector}
         else:
             # Anında kontrol
@@ -298,6 +400,8 @@ def web_exists(params):
             return {"status": "success", "action": "web_exists", "exists": len(elements) > 0, "selector": selector, "count": len(elements)}
     except TimeoutException:
         return {"status": "success", "action": "web_exists", "exists": False, "selector": selector, "timeout": True}
+    except CommandCancelled:
+        raise
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
@@ -322,7 +426,7 @@ def web_wait(params):
         else:
             condition = EC.presence_of_element_located((get_by(by), selector))
         
-        element = WebDriverWait(session.driver, timeout).until(condition)
+        element = wait_until(condition, timeout)
         
         return {
             "status": "success",
@@ -334,57 +438,47 @@ def web_wait(params):
         }
     except TimeoutException:
         return {"status": "error", "message": f"Timeout waiting for: {selector}"}
+    except CommandCancelled:
+        raise
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
 
 def web_screenshot(params):
-    """Sayfa screenshot'ı al (küçültülmüş JPEG)"""
+    """Sayfa screenshot'ı al (küçültülmüş, adaptif kodlanmış, bellekte - temp dosya yok)"""
     error = session.ensure_open()
     if error:
         return error
     
     filename = params.get("filename", "web_screenshot.jpg")
-    # Uzantıyı .jpg yap
-    if filename.endswith('.png'):
-        filename = filename[:-4] + '.jpg'
     fullpath = os.path.join(SCREENSHOT_DIR, filename)
     
     try:
-        # Önce temp PNG al
-        temp_path = os.path.join(SCREENSHOT_DIR, "_temp_web.png")
-        session.driver.save_screenshot(temp_path)
+        encoding = encoder.options_from_params(params)
+        output = delivery.options_from_params(params)
         
-        # PIL ile aç, küçült, JPEG kaydet
+        # PNG byte'larını doğrudan al, PIL ile bellekte aç
         from PIL import Image
-        img = Image.open(temp_path)
+        img = Image.open(io.BytesIO(session.driver.get_screenshot_as_png()))
         original_w, original_h = img.width, img.height
         
         # Küçült
         if img.width > MAX_WIDTH:
             ratio = MAX_WIDTH / img.width
             new_height = int(img.height * ratio)
-            img = img.resize((MAX_WIDTH, new_height), Image.LANCZOS)
+            img = imaging.resize(img, MAX_WIDTH, new_height, params.get("resize"))
         
-        # RGBA -> RGB
-        if img.mode == 'RGBA':
-            img = img.convert('RGB')
-        
-        # JPEG kaydet
-        img.save(fullpath, "JPEG", quality=JPEG_QUALITY, optimize=True)
-        
-        # Temp sil
-        try:
-            os.remove(temp_path)
-        except:
-            pass
+        # Format/kalite karara göre (uzantı seçilen formata uyar)
+        encoded = encoder.encode(img, **encoding)
+        fullpath = encoder.with_extension(fullpath, encoded)
+        fields = delivery.deliver(encoded, fullpath, output["delivery"], output["persist"])
         
-        size_kb = round(os.path.getsize(fullpath) / 1024, 1)
         return {
             "status": "success",
             "action": "web_screenshot",
-            "path": fullpath,
-            "size_kb": size_kb,
+            **fields,
+            "size_kb": round(encoded.size / 1024, 1),
+            "encode": encoded.info(),
             "original_size": [original_w, original_h],
             "resized_size": [img.width, img.height],
             "url": session.driver.current_url
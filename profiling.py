@@ -0,0 +1,132 @@
+"""
+Komut bazlı profil çıkarma
+==========================
+Herhangi bir komuta "profile" eklenirse handler cProfile (ve istenirse
+tracemalloc) altında çalışır. Tam profil profiles/ dizinine yazılır,
+sonuçta dosya yolları ve en pahalı N fonksiyon döner.
+
+    {"action": "get_ui_elements", "params": {...}, "profile": true}
+    {"action": "screenshot", "params": {}, "profile": {"memory": true, "top": 10}}
+
+Profil dosyası: python -m pstats profiles/<ad>.prof  veya snakeviz ile açılabilir.
+"""
+
+import os
+import re
+import time
+import pstats
+import cProfile
+import threading
+import tracemalloc
+
+BRIDGE_DIR = os.path.dirname(os.path.abspath(__file__))
+PROFILE_DIR = os.path.join(BRIDGE_DIR, "profiles")
+DEFAULT_TOP = 20
+SORT_KEYS = {"cumulative": 3, "tottime": 2, "ncalls": 1}
+
+# Python 3.12+ aynı anda tek cProfile'a izin verir - profilli komutlar sırayla çalışır
+_profile_lock = threading.Lock()
+
+# tracemalloc süreç genelidir; iç içe/eşzamanlı profillerde tek kez başlat/durdur
+_memory_lock = threading.Lock()
+_memory_users = 0
+
+
+def _options(profile):
+    if isinstance(profile, dict):
+        return profile
+    return {}
+
+
+def _start_memory():
+    global _memory_users
+    with _memory_lock:
+        if _memory_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _memory_users += 1
+        tracemalloc.reset_peak()
+    return tracemalloc.take_snapshot()
+
+
+def _stop_memory(before, top):
+    global _memory_users
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    with _memory_lock:
+        _memory_users -= 1
+        if _memory_users == 0:
+            tracemalloc.stop()
+
+    diffs = after.compare_to(before, "lineno")[:top]
+    return {
+        "peak_kb": round(peak / 1024, 1),
+        "net_kb": round(sum(d.size_diff for d in after.compare_to(before, "filename")) / 1024, 1),
+        "top": [
+            {
+                "location": f"{d.traceback[0].filename}:{d.traceback[0].lineno}",
+                "size_diff_kb": round(d.size_diff / 1024, 1),
+                "count_diff": d.count_diff
+            }
+            for d in diffs
+        ],
+        "note": "tracemalloc covers all threads, not only this command"
+    }
+
+
+def _top_functions(profiler, top, sort):
+    stats = pstats.Stats(profiler).stats
+    column = SORT_KEYS.get(sort, SORT_KEYS["cumulative"])
+    rows = sorted(stats.items(), key=lambda item: item[1][column], reverse=True)[:top]
+    return [
+        {
+            "function": f"{os.path.basename(filename)}:{line}({name})",
+            "ncalls": ncalls,
+            "tottime_ms": round(tottime * 1000, 3),
+            "cumtime_ms": round(cumtime * 1000, 3)
+        }
+        for (filename, line, name), (_, ncalls, tottime, cumtime, _) in rows
+    ]
+
+
+def profile_call(func, args, profile, label):
+    """func(*args)'ı profil altında çalıştır → (sonuç, profil özeti)"""
+    options = _options(profile)
+    top = int(options.get("top", DEFAULT_TOP))
+    sort = options.get("sort", "cumulative")
+    memory = options.get("memory", False)
+
+    name = re.sub(r"[^A-Za-z0-9._-]", "_", label)[:96]
+    base = os.path.join(PROFILE_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{name}")
+
+    with _profile_lock:
+        try:
+            snapshot = _start_memory() if memory else None
+            profiler = cProfile.Profile()
+            profiler.enable()
+        except Exception as e:
+            # Profil başlatılamadı (örn. başka bir profiler aktif) - komut yine de çalışsın
+            return func(*args), {"status": "error", "message": f"Profiler unavailable: {e}"}
+
+        start = time.perf_counter()
+        try:
+            result = func(*args)
+        finally:
+            profiler.disable()
+            elapsed = time.perf_counter() - start
+            memory_info = _stop_memory(snapshot, top) if memory else None
+
+    info = {"elapsed_ms": round(elapsed * 1000, 2), "sort": sort}
+    try:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        profiler.dump_stats(f"{base}.prof")
+        with open(f"{base}.txt", 'w', encoding='utf-8') as f:
+            pstats.Stats(profiler, stream=f).sort_stats(sort).print_stats(top)
+        info["path"] = f"{base}.prof"
+        info["text_path"] = f"{base}.txt"
+    except OSError as e:
+        info["write_error"] = str(e)
+
+    info["top"] = _top_functions(profiler, top, sort)
+    if memory_info:
+        info["memory"] = memory_info
+    return result, info
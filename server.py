@@ -0,0 +1,98 @@
+"""
+Localhost HTTP transport
+========================
+Dosya protokolüne ek, isteğe bağlı taşıma katmanı. Aynı process_command
+dispatcher'ını çağırır ve sonucu aynı bağlantı üzerinden döndürür
+(keep-alive destekli, disk ve polling yok).
+
+    POST http://127.0.0.1:<port>/command
+    {"id": "1", "action": "click", "params": {"x": 10, "y": 20}}
+
+Screenshot'lar bu transport'ta varsayılan olarak inline (base64) döner;
+komutta "delivery": "file" | "shm" ile değiştirilebilir.
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+MAX_BODY = 16 * 1024 * 1024
+DEFAULT_DELIVERY = "inline"   # Görüntü aynı yanıtla döner, diske yazılmaz
+
+
+class CommandRequestHandler(BaseHTTPRequestHandler):
+    """POST /command → JSON sonuç"""
+
+    protocol_version = "HTTP/1.1"   # Keep-alive: bağlantı komutlar arasında açık kalır
+    disable_nagle_algorithm = True  # Küçük yanıtlarda 40 ms gecikmeyi önle
+
+    def _send_json(self, code, data):
+        body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok"})
+        else:
+            self._send_json(404, {"status": "error", "message": "Not found"})
+
+    def do_POST(self):
+        if self.path != "/command":
+            self._send_json(404, {"status": "error", "message": "Not found"})
+            return
+
+        # Tarayıcıdan gelen istekleri reddet (localhost'a CSRF ile komut gönderilemesin)
+        if self.headers.get("Origin"):
+            self._send_json(403, {"status": "error", "message": "Cross-origin requests are not allowed"})
+            return
+        if not self.headers.get("Content-Type", "").startswith("application/json"):
+            self._send_json(415, {"status": "error", "message": "Content-Type must be application/json"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length <= 0 or length > MAX_BODY:
+            self._send_json(400, {"status": "error", "message": "Invalid Content-Length"})
+            return
+
+        try:
+            cmd_data = json.loads(self.rfile.read(length))
+        except ValueError as e:
+            self._send_json(400, {"status": "error", "message": f"Invalid JSON: {e}"})
+            return
+        if not isinstance(cmd_data, dict):
+            self._send_json(400, {"status": "error", "message": "Command must be a JSON object"})
+            return
+        cmd_data.setdefault("delivery", DEFAULT_DELIVERY)
+
+        try:
+            result = self.server.handle(cmd_data)
+        except Exception as e:
+            result = {"status": "error", "message": str(e)}
+        self._send_json(200, result)
+
+    def log_message(self, format, *args):
+        """Komutlar zaten bridge konsoluna loglanıyor"""
+        pass
+
+
+class CommandServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, handle):
+        self.handle = handle
+        super().__init__(address, CommandRequestHandler)
+
+
+def start_http_server(handle, port, host="127.0.0.1"):
+    """HTTP sunucusunu arka plan thread'inde başlat"""
+    server = CommandServer((host, port), handle)
+    thread = threading.Thread(target=server.serve_forever, name="http-transport", daemon=True)
+    thread.start()
+    return server
@@ -0,0 +1,141 @@
+"""
+Komut girişi izleyici
+=====================
+Linux'ta inotify ile olay tabanlı bekleme, diğer platformlarda
+adaptif (geri çekilmeli) polling.
+"""
+
+import os
+import sys
+import time
+import select
+import struct
+import ctypes
+import ctypes.util
+
+# ============== AYARLAR ==============
+POLL_MIN_INTERVAL = 0.01     # Aktivite sonrası ilk polling aralığı (saniye)
+POLL_MAX_INTERVAL = 0.1      # Boşta en uzun polling aralığı (eski sabit 0.2 s döngüden kötü olmasın)
+POLL_BACKOFF = 1.5           # Her boş turda aralık çarpanı
+
+# inotify sabitleri (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def file_signature(path):
+    """Dosyanın (inode, mtime, boyut) imzası - yoksa None"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+# ============== INOTIFY ==============
+class InotifyWaiter:
+    """Linux inotify ile dosya yazımlarını bekle (close-write / moved-to)"""
+
+    kind = "inotify"
+
+    def __init__(self):
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, f"inotify_init1 failed: {os.strerror(err)}")
+        self._watches = {}  # wd -> izlenen dosya adları (None = hepsi)
+
+    def add_watch(self, directory, names=None):
+        """Dizini izle; names verilirse sadece bu dosya adları uyandırır"""
+        wd = self._libc.inotify_add_watch(
+            self.fd, os.fsencode(directory), IN_CLOSE_WRITE | IN_MOVED_TO
+        )
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, f"inotify_add_watch failed: {os.strerror(err)}")
+        self._watches[wd] = set(names) if names else None
+
+    def wait(self, timeout=None):
+        """İlgili bir olay gelene kadar bekle. Olay geldiyse True döner."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            ready, _, _ = select.select([self.fd], [], [], remaining)
+            if not ready:
+                return False
+            if self._drain():
+                return True
+
+    def _drain(self):
+        """Bekleyen olayları oku, izlenen bir dosya değiştiyse True"""
+        matched = False
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return matched
+            offset = 0
+            while offset < len(data):
+                wd, _mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b"\0").decode("utf-8", "replace")
+                offset += length
+                if wd not in self._watches:
+                    continue
+                names = self._watches[wd]
+                if names is None or name in names:
+                    matched = True
+
+    def activity(self):
+        """Olay tabanlı beklemede geri çekilme yok"""
+        pass
+
+    def close(self):
+        os.close(self.fd)
+
+
+# ============== ADAPTİF POLLING ==============
+class AdaptivePoller:
+    """Notifier yoksa: aktivite sonrası sık, boşta giderek seyrek polling"""
+
+    kind = "poll"
+
+    def __init__(self, min_interval=POLL_MIN_INTERVAL, max_interval=POLL_MAX_INTERVAL,
+                 backoff=POLL_BACKOFF):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.interval = min_interval
+
+    def add_watch(self, directory, names=None):
+        """Polling tüm dizinleri zaten kontrol ediyor"""
+        pass
+
+    def wait(self, timeout=None):
+        """Bir polling aralığı bekle. Polling'de olay bilgisi yok, hep False."""
+        interval = self.interval if timeout is None else min(self.interval, timeout)
+        time.sleep(interval)
+        self.interval = min(self.interval * self.backoff, self.max_interval)
+        return False
+
+    def activity(self):
+        """Komut geldi - aralığı sıfırla"""
+        self.interval = self.min_interval
+
+    def close(self):
+        pass
+
+
+def create_waiter(force_poll=False):
+    """Platforma uygun bekleyiciyi seç (inotify → adaptif polling)"""
+    if not force_poll and sys.platform.startswith("linux"):
+        try:
+            return InotifyWaiter()
+        except (OSError, AttributeError):
+            pass
+    return AdaptivePoller()